@@ -0,0 +1,123 @@
+# ---------------------------------------------------------------------------------------------
+#   Banded matrices: bandwidth detection, LAPACK banded storage and batched solves
+#   Updated: Oct 18, 2026
+#   Reference:
+#       https://docs.scipy.org/doc/scipy/reference/generated/scipy.linalg.solve_banded.html
+# ---------------------------------------------------------------------------------------------
+import numpy as np
+import scipy.sparse as sp
+from scipy.linalg import solve_banded
+
+"""
+    In the LAPACK banded storage, A[i, j] is stored at ab[u + i - j, j], so that ab has only
+    l + u + 1 rows. The entries of ab that do not correspond to an element of A (the top-left and
+    bottom-right corners) are ignored.
+
+    Independent banded systems of the same size can be solved in one go: stacked one after the other
+    they form a single banded system with the same (l, u), as long as the corner entries of ab,
+    which would couple neighbouring systems, are set to zero.
+"""
+
+def _nonzeros(A) -> tuple:
+    if sp.issparse(A):
+        A = A.tocoo()
+        mask = A.data != 0
+        return A.row[mask], A.col[mask], A.data[mask]
+    A = np.asarray(A)
+    i, j = np.nonzero(A)
+    return i, j, A[i, j]
+
+def bandwidth(A) -> tuple:
+    """
+    :param A: a square matrix, dense or scipy.sparse
+    :return: (l, u), the number of non-zero lower and upper diagonals
+    """
+    i, j, _ = _nonzeros(A)
+    if i.size == 0:
+        return 0, 0
+    return int(max(np.max(i - j), 0)), int(max(np.max(j - i), 0))
+
+def to_banded(A, l: int=None, u: int=None) -> tuple:
+    """
+    :param A: a square matrix, dense or scipy.sparse
+    :param l: number of lower diagonals to store (detected if None)
+    :param u: number of upper diagonals to store (detected if None)
+    :return: ((l, u), ab), ready for solve_banded((l, u), ab, b)
+    """
+    assert A.shape[0] == A.shape[1]
+    if l is None or u is None:
+        l_det, u_det = bandwidth(A)
+        l = l_det if l is None else l
+        u = u_det if u is None else u
+    i, j, values = _nonzeros(A)
+    assert np.all(i - j <= l) and np.all(j - i <= u), "A has entries outside the requested band"
+
+    ab = np.zeros((l + u + 1, A.shape[1]), dtype=np.result_type(values, np.float64))
+    ab[u + i - j, j] = values
+    return (l, u), ab
+
+def solve_banded_auto(A, b: np.ndarray) -> np.ndarray:
+    """
+    Solve Ax = b with the banded solver after detecting the bandwidth of A.
+    """
+    l_and_u, ab = to_banded(A)
+    return solve_banded(l_and_u, ab, b)
+
+def solve_banded_batched(l_and_u: tuple, ab: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Solve m independent banded systems A_k x_k = b_k with one LAPACK call.
+
+    :param l_and_u: (l, u), the number of non-zero lower and upper diagonals
+    :param ab: the banded storage of all matrices, shape (m, l + u + 1, n)
+    :param b: the right-hand sides, shape (m, n) or (m, n, k)
+    :return: the solutions, with the same shape as b
+    """
+    l, u = l_and_u
+    m, rows, n = ab.shape
+    assert rows == l + u + 1 and b.shape[:2] == (m, n)
+
+    ab = ab.copy()
+    for d in range(1, u + 1):
+        ab[:, u - d, :d] = 0        # A[j - d, j] would reach into the previous system
+    for d in range(1, l + 1):
+        ab[:, u + d, n - d:] = 0    # A[j + d, j] would reach into the next system
+
+    stacked = np.moveaxis(ab, 1, 0).reshape(rows, m * n)
+    x = solve_banded((l, u), stacked, b.reshape((m * n,) + b.shape[2:]), check_finite=False)
+    return x.reshape(b.shape)
+
+def thomas(lower: np.ndarray, diag: np.ndarray, upper: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    Batched tridiagonal solver: rows of the inputs are independent systems of size n, i.e.
+        lower[k, i] x[k, i - 1] + diag[k, i] x[k, i] + upper[k, i] x[k, i + 1] = rhs[k, i].
+
+    :param lower: sub-diagonal, shape (m, n); lower[:, 0] is ignored
+    :param diag: main diagonal, shape (m, n)
+    :param upper: super-diagonal, shape (m, n); upper[:, -1] is ignored
+    :param rhs: right-hand sides, shape (m, n)
+    :return: the solutions, shape (m, n), or (n,) if all the inputs are 1-D
+    """
+    single = max(np.ndim(v) for v in (lower, diag, upper, rhs)) == 1
+    diag = np.atleast_2d(diag)
+    ab = np.empty((diag.shape[0], 3, diag.shape[1]), dtype=np.result_type(lower, diag, upper, np.float64))
+    ab[:, 0, 1:] = np.broadcast_to(upper, diag.shape)[:, :-1]
+    ab[:, 1] = diag
+    ab[:, 2, :-1] = np.broadcast_to(lower, diag.shape)[:, 1:]
+    x = solve_banded_batched((1, 1), ab, np.broadcast_to(rhs, diag.shape))
+    return x[0] if single else x
+
+if __name__ == "__main__":
+    from l1_q3 import a, b, ab
+
+    (l, u), ab_auto = to_banded(a)
+    print(f"(l, u) = {(l, u)}, same storage as l1_q3: {np.array_equal(ab_auto, ab)}")
+    print(f"x = {solve_banded_auto(a, b)}")
+
+    # 10000 tridiagonal systems (4 on the diagonal, 1 off the diagonal) with random right-hand sides
+    m, n = 10000, 64
+    rhs = np.random.default_rng(42).normal(size=(m, n))
+    x = thomas(np.ones((m, n)), 4 * np.ones((m, n)), np.ones((m, n)), rhs)
+    residual = 4 * x - rhs
+    residual[:, 1:] += x[:, :-1]
+    residual[:, :-1] += x[:, 1:]
+    print(f"max residual over {m} systems = {np.abs(residual).max():.2e}")
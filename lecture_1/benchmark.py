@@ -0,0 +1,213 @@
+# ---------------------------------------------------------------------------------------------
+#   Scaling benchmark of the lecture 1 linear solvers
+#   Updated: Oct 18, 2026
+#   Usage:
+#       python benchmark.py --output bench.json
+#       python benchmark.py --output new.json --compare bench.json --threshold 1.5
+# ---------------------------------------------------------------------------------------------
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import scipy
+import scipy.sparse as sp
+from scipy.linalg import solve, lu_factor, lu_solve, solve_banded
+from l1_q4 import SweepKernel, gauss_seidel, red_black_ordering
+from l1_q6 import sor
+from banded import to_banded
+
+"""
+    Every (problem, n, method) case is run once as a warm-up, then timed `repeats` times. The setup
+    of the iterative methods (the ordering and the SweepKernel) does not depend on b, so it is built
+    once before the timed runs and reported separately as setup_time. The peak memory is measured
+    in a separate run under tracemalloc, which sees the NumPy / SciPy array allocations of the solve
+    (but not the internal workspace of compiled libraries such as SuperLU).
+
+    Problems:
+        diagonally_dominant:  dense random matrix with |a_ii| > sum_j |a_ij|
+        banded:               pentadiagonal, diagonally dominant (sparse)
+        poisson:              2D 5-point Laplacian on a sqrt(n) x sqrt(n) grid (sparse)
+"""
+
+DEFAULT_SIZES = [10, 100, 1000, 10**4, 10**5, 10**6]
+
+def diagonally_dominant(n: int, rng: np.random.Generator):
+    A = rng.uniform(-1, 1, size=(n, n))
+    np.fill_diagonal(A, np.abs(A).sum(axis=1) + 1)
+    return A
+
+def banded(n: int, rng: np.random.Generator):
+    offsets = [-2, -1, 0, 1, 2]
+    diagonals = [rng.uniform(-1, 1, size=n - abs(k)) for k in offsets]
+    diagonals[2] = 5 + rng.uniform(0, 1, size=n)
+    return sp.diags(diagonals, offsets, format="csr")
+
+def poisson(n: int, rng: np.random.Generator):
+    m = int(round(np.sqrt(n)))
+    T = sp.diags([-1, 4, -1], [-1, 0, 1], shape=(m, m), dtype=np.float64)
+    S = sp.diags([1, 1], [-1, 1], shape=(m, m), dtype=np.float64)
+    return (sp.kron(sp.identity(m), T) - sp.kron(S, sp.identity(m))).tocsr()
+
+PROBLEMS = {"diagonally_dominant": diagonally_dominant, "banded": banded, "poisson": poisson}
+
+def run_solve(A, b, args, setup):
+    return solve(A, b), None
+
+def run_lu_solve(A, b, args, setup):
+    return lu_solve(lu_factor(A), b), None
+
+def run_solve_banded(A, b, args, setup):
+    l_and_u, ab = to_banded(A)
+    return solve_banded(l_and_u, ab, b), None
+
+def ordering_for(A):
+    """
+    :return: the red-black colors if the sparse matrix graph is two-colorable, "multicolor" for other
+             sparse matrices and "natural" for dense ones
+    """
+    if not sp.issparse(A):
+        return "natural"
+    try:
+        return red_black_ordering(A)
+    except ValueError:
+        return "multicolor"
+
+def setup_for(A, method: str):
+    """
+    :return: the prebuilt SweepKernel for the iterative methods, None for the direct ones
+    """
+    if method in ("gauss_seidel", "sor"):
+        return SweepKernel(A, ordering_for(A))
+    return None
+
+def run_gauss_seidel(A, b, args, setup):
+    x, info = gauss_seidel(A, b, tol=args.tol, max_iter=args.max_iter, ordering=setup, full_output=True)
+    return x, info["iterations"]
+
+def run_sor(A, b, args, setup):
+    x, info = sor(A, b, omega="auto", tol=args.tol, max_iter=args.max_iter, ordering=setup, full_output=True)
+    return x, info["iterations"]
+
+METHODS = {"solve": run_solve, "lu_solve": run_lu_solve, "solve_banded": run_solve_banded,
+           "gauss_seidel": run_gauss_seidel, "sor": run_sor}
+
+def applicable(problem: str, method: str, n: int, args) -> bool:
+    """
+    :return: whether the case fits the method and the size limits
+    """
+    if problem == "diagonally_dominant" and n > args.max_dense:
+        return False
+    if method in ("solve", "lu_solve"):
+        return n <= args.max_dense
+    if method == "solve_banded":
+        bandwidth = {"diagonally_dominant": 2 * n, "banded": 5, "poisson": 2 * int(round(np.sqrt(n))) + 1}[problem]
+        return bandwidth * n * 8 <= args.max_banded_bytes
+    return True
+
+def run_case(problem: str, method: str, n: int, args) -> dict:
+    rng = np.random.default_rng(args.seed)
+    A = PROBLEMS[problem](n, rng)
+    b = rng.uniform(-1, 1, size=A.shape[0])
+    if method in ("solve", "lu_solve") and sp.issparse(A):
+        A = A.toarray()
+    run = METHODS[method]
+    record = {"problem": problem, "n": A.shape[0], "method": method}
+
+    start = time.perf_counter()
+    setup = setup_for(A, method)
+    setup_time = time.perf_counter() - start
+
+    def attempt():
+        try:
+            return run(A, b, args, setup) + (True,)
+        except ValueError as error:
+            if "did not converge" not in str(error):
+                raise
+            return None, args.max_iter, False   # an iterative method hit max_iter
+
+    attempt()       # warm-up
+    times = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        x, iterations, converged = attempt()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    attempt()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    record.update(setup_time=setup_time, time_min=min(times), time_median=float(np.median(times)),
+                  repeats=args.repeats, peak_bytes=peak, iterations=iterations, converged=converged)
+    if x is not None:
+        record["relative_residual"] = float(np.linalg.norm(A @ x - b) / np.linalg.norm(b))
+    return record
+
+def compare(results: list, baseline_file: str, threshold: float, min_seconds: float) -> list:
+    """
+    :return: descriptions of the cases that became slower than threshold * baseline
+             (cases faster than min_seconds in the baseline are too noisy to be compared)
+    """
+    with open(baseline_file) as f:
+        baseline = {(r["problem"], r["n"], r["method"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        old = baseline.get((r["problem"], r["n"], r["method"]))
+        if old is None or old["time_min"] < min_seconds:
+            continue
+        if r["time_min"] > threshold * old["time_min"] or old["converged"] and not r["converged"]:
+            regressions.append(f"{r['method']} on {r['problem']} (n = {r['n']}): "
+                               f"{old['time_min']:.3e} s -> {r['time_min']:.3e} s")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the lecture 1 linear solvers")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--problems", nargs="+", default=list(PROBLEMS), choices=list(PROBLEMS))
+    parser.add_argument("--methods", nargs="+", default=list(METHODS), choices=list(METHODS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tol", type=float, default=1e-8)
+    parser.add_argument("--max-iter", type=int, default=2000)
+    parser.add_argument("--max-dense", type=int, default=3000, help="largest n for dense matrices")
+    parser.add_argument("--max-banded-bytes", type=float, default=2**28, help="memory limit of the banded storage")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench.json")
+    parser.add_argument("--compare", default=None, help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed slowdown with respect to the baseline")
+    parser.add_argument("--min-seconds", type=float, default=1e-3, help="shortest baseline time that is compared")
+    args = parser.parse_args(argv)
+
+    results = []
+    for problem in args.problems:
+        for n in args.sizes:
+            for method in args.methods:
+                if not applicable(problem, method, n, args):
+                    continue
+                record = run_case(problem, method, n, args)
+                results.append(record)
+                print(f"{problem:>20s}  n = {record['n']:>8d}  {method:>12s}: {record['time_min']:.3e} s "
+                      f"(setup {record['setup_time']:.1e} s), "
+                      f"peak {record['peak_bytes'] / 2**20:8.1f} MiB, iterations {record['iterations']}, "
+                      f"converged {record['converged']}")
+
+    report = {
+        "metadata": {"python": sys.version.split()[0], "numpy": np.__version__, "scipy": scipy.__version__,
+                     "platform": platform.platform(), "processor": platform.processor(), "args": vars(args)},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare is not None:
+        regressions = compare(results, args.compare, args.threshold, args.min_seconds)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
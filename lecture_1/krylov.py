@@ -0,0 +1,264 @@
+# ---------------------------------------------------------------------------------------------
+#   Preconditioned Krylov subspace methods: CG, BiCGSTAB and restarted GMRES
+#   Updated: Oct 18, 2026
+#   Reference:
+#       Y. Saad, Iterative Methods for Sparse Linear Systems, 2nd ed. (2003), chap. 6, 7 & 9
+#       https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.linalg.LinearOperator.html
+#       https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.linalg.spilu.html
+# ---------------------------------------------------------------------------------------------
+import numpy as np
+import scipy.sparse as sp
+from scipy.linalg import solve, solve_triangular
+from scipy.sparse.linalg import LinearOperator, aslinearoperator, spilu
+from l1_q4 import SweepKernel
+
+"""
+    The solvers share the interface of gauss_seidel(A, b, tol, max_iter, x0), so the drivers of
+    l1_q5 / l1_q6 can switch between them through SOLVERS. A may be a dense array, a sparse matrix
+    or a matrix-free LinearOperator; only products A @ v are needed.
+
+    Unlike the stationary iterations, which stop on the size of the update, the Krylov solvers stop
+    once the relative residual ||b - A x||_2 / ||b||_2 drops below tol. With full_output=True they
+    also return a dict whose "residuals" entry holds ||b - A x||_2 after every iteration.
+
+    A preconditioner M approximates A^{-1}: it is any object with M @ r, e.g. a LinearOperator.
+"""
+
+def jacobi_preconditioner(A) -> LinearOperator:
+    """
+    :param A: the coefficient matrix, dense or sparse
+    :return: M = D^{-1}
+    """
+    inv_diag = 1.0 / np.asarray(A.diagonal(), dtype=np.float64)
+    return LinearOperator(A.shape, matvec=lambda r: inv_diag * r.ravel(), dtype=np.float64)
+
+def ssor_preconditioner(A, omega: float=1.0, ordering="natural") -> LinearOperator:
+    """
+    :param A: the coefficient matrix, dense or sparse, or a prebuilt SweepKernel
+    :param omega: the relaxation factor in (0, 2)
+    :param ordering: sweep ordering, see l1_q4.gauss_seidel
+    :return: M, one symmetric SOR sweep (forward, then backward) on A z = r starting from z = 0
+    """
+    kernel = A if isinstance(A, SweepKernel) else SweepKernel(A, ordering)
+
+    def matvec(r):
+        r = np.asarray(r, dtype=np.float64).ravel()
+        z = np.zeros(kernel.n)
+        kernel.forward(z, r, omega)
+        kernel.backward(z, r, omega)
+        return z
+
+    return LinearOperator((kernel.n, kernel.n), matvec=matvec, dtype=np.float64)
+
+def ilu_preconditioner(A, drop_tol: float=1e-4, fill_factor: float=10) -> LinearOperator:
+    """
+    :param A: the coefficient matrix, dense or sparse
+    :param drop_tol: entries of the factors smaller than drop_tol are discarded
+    :param fill_factor: maximum fill-in relative to the number of non-zeros of A
+    :return: M = (LU)^{-1} with the incomplete LU factors of A
+    """
+    ilu = spilu(sp.csc_matrix(A, dtype=np.float64), drop_tol=drop_tol, fill_factor=fill_factor)
+    return LinearOperator(A.shape, matvec=ilu.solve, dtype=np.float64)
+
+def _setup(A, b, x0, M) -> tuple:
+    A = aslinearoperator(A)
+    assert A.shape[0] == A.shape[1]
+    b = np.asarray(b, dtype=np.float64).ravel()
+    x = np.zeros(A.shape[0]) if x0 is None else np.array(x0, dtype=np.float64).ravel()
+    M = (lambda r: r) if M is None else (M.matvec if isinstance(M, LinearOperator) else (lambda r: M @ r))
+    b_norm = np.linalg.norm(b)
+    return A, b, x, M, b_norm if b_norm > 0 else 1.0
+
+def _finish(x, residuals, k, converged, max_iter, full_output):
+    if not converged:
+        raise ValueError(f"The algorithm did not converge within {max_iter} iterations. Final x: {x}")
+    return (x, {"iterations": k, "residuals": residuals[:k + 1]}) if full_output else x
+
+def cg(A, b: np.ndarray, tol: float, max_iter: int, x0: np.ndarray=None, M=None, full_output: bool=False):
+    """
+    Preconditioned conjugate gradient method for symmetric positive definite A.
+
+    :param A: the coefficient matrix (dense, sparse or LinearOperator)
+    :param b: the right-hand side vector b
+    :param tol: the tolerance on the relative residual
+    :param max_iter: maximum iteration count
+    :param x0: initial guess for x
+    :param M: the preconditioner (symmetric positive definite), None for no preconditioning
+    :param full_output: also return a dict with the iteration count and the residual history
+    :return: the solution vector x (and the info dict)
+    """
+    A, b, x, M, b_norm = _setup(A, b, x0, M)
+    residuals = np.empty(max_iter + 1)
+
+    r = b - A.matvec(x)
+    residuals[0] = np.linalg.norm(r)
+    k, converged = 0, residuals[0] <= tol * b_norm
+    if not converged:
+        z = M(r)
+        p = z.copy()
+        rz = r @ z
+    while not converged and k < max_iter:
+        Ap = A.matvec(p)
+        alpha = rz / (p @ Ap)
+        x += alpha * p
+        r -= alpha * Ap
+        k += 1
+        residuals[k] = np.linalg.norm(r)
+        converged = residuals[k] <= tol * b_norm
+        if not converged:
+            z = M(r)
+            rz, rz_old = r @ z, rz
+            p *= rz / rz_old
+            p += z
+
+    return _finish(x, residuals, k, converged, max_iter, full_output)
+
+def bicgstab(A, b: np.ndarray, tol: float, max_iter: int, x0: np.ndarray=None, M=None, full_output: bool=False):
+    """
+    Right-preconditioned BiCGSTAB for general (non-symmetric) A.
+
+    :param A: the coefficient matrix (dense, sparse or LinearOperator)
+    :param b: the right-hand side vector b
+    :param tol: the tolerance on the relative residual
+    :param max_iter: maximum iteration count
+    :param x0: initial guess for x
+    :param M: the preconditioner, None for no preconditioning
+    :param full_output: also return a dict with the iteration count and the residual history
+    :return: the solution vector x (and the info dict)
+    """
+    A, b, x, M, b_norm = _setup(A, b, x0, M)
+    residuals = np.empty(max_iter + 1)
+
+    r = b - A.matvec(x)
+    r_hat = r.copy()
+    residuals[0] = np.linalg.norm(r)
+    k, converged = 0, residuals[0] <= tol * b_norm
+    rho, alpha, omega = 1.0, 1.0, 1.0
+    p, v = np.zeros_like(r), np.zeros_like(r)
+
+    while not converged and k < max_iter:
+        rho, rho_old = r_hat @ r, rho
+        if rho == 0:
+            raise ValueError(f"BiCGSTAB broke down (rho = 0) after {k} iterations. Final x: {x}")
+        beta = (rho / rho_old) * (alpha / omega)
+        p -= omega * v
+        p *= beta
+        p += r
+        p_hat = M(p)
+        v = A.matvec(p_hat)
+        alpha = rho / (r_hat @ v)
+        r -= alpha * v                  # r is now s = r - alpha * v
+        x += alpha * p_hat
+        k += 1
+        residuals[k] = np.linalg.norm(r)
+        if residuals[k] <= tol * b_norm:
+            converged = True
+            break
+        s_hat = M(r)
+        t = A.matvec(s_hat)
+        omega = (t @ r) / (t @ t)
+        x += omega * s_hat
+        r -= omega * t
+        residuals[k] = np.linalg.norm(r)
+        converged = residuals[k] <= tol * b_norm
+        if omega == 0 and not converged:
+            raise ValueError(f"BiCGSTAB broke down (omega = 0) after {k} iterations. Final x: {x}")
+
+    return _finish(x, residuals, k, converged, max_iter, full_output)
+
+def gmres(A, b: np.ndarray, tol: float, max_iter: int, x0: np.ndarray=None, M=None, restart: int=30,
+          full_output: bool=False):
+    """
+    Right-preconditioned GMRES, restarted every `restart` iterations.
+
+    :param A: the coefficient matrix (dense, sparse or LinearOperator)
+    :param b: the right-hand side vector b
+    :param tol: the tolerance on the relative residual
+    :param max_iter: maximum iteration count (total number of Arnoldi steps)
+    :param x0: initial guess for x
+    :param M: the preconditioner, None for no preconditioning
+    :param restart: dimension of the Krylov subspace before restarting
+    :param full_output: also return a dict with the iteration count and the residual history
+    :return: the solution vector x (and the info dict)
+    """
+    A, b, x, M, b_norm = _setup(A, b, x0, M)
+    n = A.shape[0]
+    restart = min(restart, n)
+    residuals = np.empty(max_iter + 1)
+    V = np.empty((restart + 1, n))
+    H = np.zeros((restart + 1, restart))
+    cs, sn, g = np.empty(restart), np.empty(restart), np.empty(restart + 1)
+
+    r = b - A.matvec(x)
+    residuals[0] = np.linalg.norm(r)
+    k, converged = 0, residuals[0] <= tol * b_norm
+
+    while not converged and k < max_iter:
+        beta = np.linalg.norm(r)
+        V[0] = r / beta
+        g[:] = 0
+        g[0] = beta
+        H[:] = 0
+        j = 0
+        while j < restart and k < max_iter:
+            w = A.matvec(M(V[j]))
+            for i in range(j + 1):          # modified Gram-Schmidt
+                H[i, j] = w @ V[i]
+                w -= H[i, j] * V[i]
+            H[j + 1, j] = np.linalg.norm(w)
+            if H[j + 1, j] > 0:
+                V[j + 1] = w / H[j + 1, j]
+
+            for i in range(j):              # apply the previous Givens rotations to the new column
+                H[i, j], H[i + 1, j] = cs[i] * H[i, j] + sn[i] * H[i + 1, j], -sn[i] * H[i, j] + cs[i] * H[i + 1, j]
+            denom = np.hypot(H[j, j], H[j + 1, j])
+            cs[j], sn[j] = H[j, j] / denom, H[j + 1, j] / denom
+            H[j, j], H[j + 1, j] = denom, 0.0
+            g[j], g[j + 1] = cs[j] * g[j], -sn[j] * g[j]
+
+            j += 1
+            k += 1
+            residuals[k] = abs(g[j])
+            if residuals[k] <= tol * b_norm:    # also catches a lucky breakdown, where |g[j]| = 0
+                break
+
+        y = solve_triangular(H[:j, :j], g[:j])
+        x += M(V[:j].T @ y)
+        r = b - A.matvec(x)
+        residuals[k] = np.linalg.norm(r)    # the true residual, which may differ from |g| by rounding
+        converged = residuals[k] <= tol * b_norm
+
+    return _finish(x, residuals, k, converged, max_iter, full_output)
+
+SOLVERS = {"cg": cg, "bicgstab": bicgstab, "gmres": gmres}
+
+m = 20      # 2D Poisson problem on an m x m grid, 5-point stencil
+T = sp.diags([-1, 4, -1], [-1, 0, 1], shape=(m, m), dtype=np.float64)
+laplacian = (sp.kron(sp.identity(m), T) - sp.kron(sp.diags([1, 1], [-1, 1], shape=(m, m), dtype=np.float64), sp.identity(m))).tocsr()
+rhs = np.ones(m * m)
+
+def apply_laplacian(v: np.ndarray) -> np.ndarray:
+    u = v.reshape(m, m)
+    out = 4 * u
+    out[1:] -= u[:-1]
+    out[:-1] -= u[1:]
+    out[:, 1:] -= u[:, :-1]
+    out[:, :-1] -= u[:, 1:]
+    return out.ravel()
+
+if __name__ == "__main__":
+    preconditioners = {
+        "none": None,
+        "Jacobi": jacobi_preconditioner(laplacian),
+        "SSOR": ssor_preconditioner(laplacian, omega=1.5),
+        "ILU": ilu_preconditioner(laplacian),
+    }
+    for name, method in SOLVERS.items():
+        for pc_name, M in preconditioners.items():
+            x, info = method(laplacian, rhs, tol=1e-10, max_iter=5000, M=M, full_output=True)
+            print(f"{name:>8s} + {pc_name:<6s}: {info['iterations']:4d} iterations, final residual {info['residuals'][-1]:.2e}")
+
+    # matrix-free: only the action of the operator is needed
+    operator = LinearOperator((m * m, m * m), matvec=apply_laplacian, dtype=np.float64)
+    x = cg(operator, rhs, tol=1e-10, max_iter=5000)
+    print(f"matrix-free CG, max error = {np.abs(x - solve(laplacian.toarray(), rhs)).max():.2e}")
@@ -2,35 +2,229 @@
 #   l1-q4, Gauss-Seidel method
 #   Author: Yi-Ming Ding
 #   Updated: Feb 19, 2025
+#   Reference:
+#       https://docs.scipy.org/doc/scipy/reference/sparse.html
+#       https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csgraph.connected_components.html
 # ---------------------------------------------------------------------------------------------
 import numpy as np
-from scipy.linalg import solve
+import scipy.sparse as sp
+from scipy.linalg import solve, solve_triangular
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import spsolve_triangular
 
-def gauss_seidel(A: np.ndarray, b: np.ndarray, tol: float, max_iter: int, x0: np.ndarray=None) -> np.ndarray:
+"""
+    Gauss-Seidel updates x_i with the newest values of its neighbours, so the natural ordering
+    i = 0, 1, ..., n-1 is inherently sequential. If the unknowns are split into colors such that
+    no two unknowns of the same color are coupled by A, all unknowns of one color can be updated
+    at once. For the 5-point Laplacian two colors suffice (red-black, the checkerboard).
+"""
+
+def _graph(A: sp.csr_matrix) -> sp.csr_matrix:
+    """
+    :param A: a square sparse matrix
+    :return: the symmetrized adjacency pattern of A, without self loops
+    """
+    G = abs(A) + abs(A.T)
+    G.setdiag(0)
+    G.eliminate_zeros()
+    return G.tocsr()
+
+def red_black_ordering(A) -> np.ndarray:
+    """
+    Two-coloring of the matrix graph (e.g. the checkerboard of a 5-point stencil).
+
+    The graph is two-colorable iff, in its bipartite double cover (every node i split into i and i'
+    with edges i - j' and i' - j), no node i is connected to its own copy i'.
+
+    :param A: the coefficient matrix A (dense or sparse)
+    :return: the color (0 or 1) of every unknown
+    """
+    G = _graph(sp.csr_matrix(A))
+    n = G.shape[0]
+    cover = sp.bmat([[None, G], [G, None]], format="csr")
+    _, labels = connected_components(cover, directed=False)
+    if np.any(labels[:n] == labels[n:]):
+        raise ValueError("The matrix graph is not two-colorable, use ordering='multicolor' instead.")
+    return (labels[:n] < labels[n:]).astype(np.intp)
+
+def multicolor_ordering(A, seed: int=0) -> np.ndarray:
+    """
+    Jones-Plassmann coloring: in every round, the uncolored unknowns whose random priority beats all
+    their uncolored neighbours form an independent set and receive the next color.
+
+    :param A: the coefficient matrix A (dense or sparse)
+    :param seed: seed for the random priorities (fixed so that the ordering is reproducible)
+    :return: the color (0, 1, ...) of every unknown
+    """
+    G = _graph(sp.csr_matrix(A))
+    n = G.shape[0]
+    priority = np.random.default_rng(seed).permutation(n)
+    colors = np.full(n, -1, dtype=np.intp)
+
+    nonempty = np.diff(G.indptr) > 0
+    starts = G.indptr[:-1][nonempty]
+    neighbour_max = np.full(n, -1)
+
+    color = 0
+    while np.any(colors < 0):
+        weight = np.where(colors < 0, priority, -1)
+        if starts.size > 0:
+            neighbour_max[nonempty] = np.maximum.reduceat(weight[G.indices], starts)
+        colors[(colors < 0) & (weight > neighbour_max)] = color
+        color += 1
+    return colors
+
+class SweepKernel:
+    """
+    Precomputed data for in-place Gauss-Seidel / SOR sweeps over Ax = b.
+
+    With ordering="natural" one sweep is a triangular solve with D / omega + L (or D / omega + U for
+    the backward sweep). With a coloring, each color is updated by one vectorized operation through
+    preallocated buffers; the only temporaries are the sparse products (L + U) x (one vector per
+    color, or per sweep with the natural ordering) and, for sparse matrices, the result of the
+    triangular solve.
+
+    Every sweep returns max |x_new - x_old| and stores ||x_new - x_old||_2 in self.last_update_l2,
+    whose ratio between sweeps estimates the convergence factor.
+    """
+    def __init__(self, A, ordering="natural"):
+        """
+        :param A: the coefficient matrix A (dense ndarray or scipy.sparse matrix, must be square)
+        :param ordering: "natural", "red-black", "multicolor", or an array with the color of every unknown
+        """
+        assert A.shape[0] == A.shape[1]
+        self.n = A.shape[0]
+        self.last_update_l2 = 0.0
+        self.sparse = sp.issparse(A)
+        A = sp.csr_matrix(A, dtype=np.float64) if self.sparse else np.asarray(A, dtype=np.float64)
+        self.diag = A.diagonal().copy()
+        assert np.all(self.diag != 0), "Zero on the diagonal of A"
+
+        if isinstance(ordering, str) and ordering == "natural":
+            self.colors = None
+            if self.sparse:
+                self.lower, self.upper = sp.tril(A, k=-1, format="csr"), sp.triu(A, k=1, format="csr")
+            else:
+                self.lower, self.upper = np.tril(A, k=-1), np.triu(A, k=1)
+            self._omega, self._triangular = None, None     # (D / omega + L, D / omega + U) for the last omega
+            self._rhs, self._x_new = np.empty(self.n), np.empty(self.n)
+            return
+
+        if isinstance(ordering, str):
+            if ordering == "red-black":
+                colors = red_black_ordering(A)
+            elif ordering == "multicolor":
+                colors = multicolor_ordering(A)
+            else:
+                raise ValueError(f"Unknown ordering: {ordering}")
+        else:
+            colors = np.asarray(ordering, dtype=np.intp)
+            assert colors.shape == (self.n,)
+        self.colors = colors
+
+        off_diag = sp.csr_matrix(A) - sp.diags(self.diag)
+        off_diag.eliminate_zeros()
+        self.blocks = []
+        for c in np.unique(colors):
+            rows = np.flatnonzero(colors == c)
+            block = off_diag[rows].tocsr()
+            block.sort_indices()
+            self.blocks.append((rows, block, 1.0 / self.diag[rows]))
+            assert not np.any(np.isin(block.indices, rows)), f"Unknowns of color {c} are coupled"
+
+        size = max(rows.size for rows, *_ in self.blocks)
+        self._old, self._new, self._abs = np.empty(size), np.empty(size), np.empty(size)
+
+    @property
+    def num_colors(self) -> int:
+        return 0 if self.colors is None else len(self.blocks)
+
+    def forward(self, x: np.ndarray, b: np.ndarray, omega: float=1.0) -> float:
+        """
+        One SOR sweep in the forward direction, updating x in place (omega = 1 is Gauss-Seidel).
+
+        :param x: the current iterate (float64, modified in place)
+        :param b: the right-hand side vector b (float64)
+        :param omega: the relaxation factor
+        :return: max |x_new - x_old|
+        """
+        if self.colors is None:
+            return self._triangular_sweep(x, b, omega, lower=True)
+        return self._colored_sweep(x, b, omega, self.blocks)
+
+    def backward(self, x: np.ndarray, b: np.ndarray, omega: float=1.0) -> float:
+        """
+        One SOR sweep in the backward direction (reversed natural or color order).
+        """
+        if self.colors is None:
+            return self._triangular_sweep(x, b, omega, lower=False)
+        return self._colored_sweep(x, b, omega, reversed(self.blocks))
+
+    def _colored_sweep(self, x, b, omega, blocks) -> float:
+        change, sum_sq = 0.0, 0.0
+        for rows, block, inv_diag in blocks:
+            m = rows.size
+            old, new, tmp = self._old[:m], self._new[:m], self._abs[:m]
+            np.take(x, rows, out=old, mode="clip")     # mode="raise" would go through a temporary copy
+            np.take(b, rows, out=new, mode="clip")
+            new -= block @ x                           # new = b - (L + U) x on this color
+            new *= inv_diag
+            new -= old
+            new *= omega                # new = x_new - x_old
+            np.abs(new, out=tmp)
+            change = max(change, tmp.max())
+            sum_sq += np.dot(new, new)
+            new += old
+            x[rows] = new
+        self.last_update_l2 = np.sqrt(sum_sq)
+        return change
+
+    def _triangular_sweep(self, x, b, omega, lower) -> float:
+        if omega != self._omega:       # SOR keeps omega fixed between adaptations: cache only the last one
+            d = self.diag / omega
+            if self.sparse:
+                self._triangular = ((self.lower + sp.diags(d)).tocsr(), (self.upper + sp.diags(d)).tocsr())
+            else:
+                self._triangular = (self.lower + np.diag(d), self.upper + np.diag(d))
+            self._omega = omega
+        M = self._triangular[0 if lower else 1]
+        rhs, x_new = self._rhs, self._x_new
+        np.multiply(self.diag, x, out=rhs)
+        rhs *= 1 / omega - 1
+        rhs += b
+        rhs -= (self.upper if lower else self.lower) @ x    # rhs = b - U x + (1 / omega - 1) D x
+
+        if self.sparse:
+            x_new[:] = spsolve_triangular(M, rhs, lower=lower, overwrite_b=True)
+        else:
+            x_new[:] = solve_triangular(M, rhs, lower=lower, overwrite_b=True, check_finite=False)
+        x -= x_new
+        change = np.linalg.norm(x, ord=np.inf)
+        self.last_update_l2 = np.linalg.norm(x)
+        x[:] = x_new
+        return change
+
+def gauss_seidel(A: np.ndarray, b: np.ndarray, tol: float, max_iter: int, x0: np.ndarray=None, ordering="natural",
+                 full_output: bool=False) -> np.ndarray:
     """
     Gauss-Seidel method for solving Ax = b
 
-    :param A:   the coefficient matrix A (must be square).
+    :param A:   the coefficient matrix A (must be square), dense or scipy.sparse (CSR preferred).
     :param b:   the right-hand side vector b.
     :param tol: the required precision (tolerance for convergence).
     :param max_iter: maximum iteration count
     :param x0: initial guess for x
-    :return: the solution vector x
+    :param ordering: "natural", "red-black", "multicolor", an array of colors, or a prebuilt SweepKernel
+    :param full_output: also return a dict with the iteration count
+    :return: the solution vector x (and the info dict)
     """
-    assert A.shape[0] == A.shape[1]
-    n = A.shape[0]
-    x = np.zeros(n) if x0 is None else x0.copy()    # for mutable object, ```.copy()``` or shallow copy does not change x0 if we modify x (not a reference)
-
-    for _ in range(max_iter):
-        x_new = x.copy()
-        for i in range(n):
-            sum1 = np.dot(A[i, :i], x_new[:i])  # use new values
-            sum2 = np.dot(A[i, i+1:], x[i+1:])  # use old values
-            x_new[i] = (b[i] - sum1 - sum2) / A[i, i]
+    kernel = ordering if isinstance(ordering, SweepKernel) else SweepKernel(A, ordering)
+    b = np.asarray(b, dtype=np.float64)
+    x = np.zeros(kernel.n) if x0 is None else np.array(x0, dtype=np.float64)    # a copy, so x0 is not modified
 
-        if np.linalg.norm(x_new - x, ord=np.inf) < tol:
-            return x_new
-        x = x_new
+    for k in range(max_iter):
+        if kernel.forward(x, b) < tol:     # max |x_new - x_old| comes for free with the sweep
+            return (x, {"iterations": k + 1}) if full_output else x
 
     raise ValueError(f"The algorithm did not converge within {max_iter} iterations. Final x: {x}")
 
@@ -45,4 +239,5 @@ b = np.array([4, 2, -11])
 if __name__ == "__main__":
     x_itr = gauss_seidel(A, b, tol=1e-5, max_iter=5000)
     print(f"x_itr = {x_itr}")
-    print(f"Reference solutions: {solve(A, b)}")
\ No newline at end of file
+    print(f"x_itr (sparse, multicolor) = {gauss_seidel(sp.csr_matrix(A), b, tol=1e-5, max_iter=5000, ordering='multicolor')}")
+    print(f"Reference solutions: {solve(A, b)}")
@@ -6,6 +6,7 @@
 import numpy as np
 from scipy.linalg import solve
 from l1_q4 import gauss_seidel
+from krylov import SOLVERS
 
 A = np.array([
     [7, 2, 1, -2],
@@ -19,4 +20,6 @@ b = np.array([4, 7, -1, 0])
 if __name__ == "__main__":
     x_itr = gauss_seidel(A, b, tol=1e-5, max_iter=5000)
     print(f"x_itr = {x_itr}")
+    for name in ("bicgstab", "gmres"):     # A is not symmetric, so CG does not apply
+        print(f"x_{name} = {SOLVERS[name](A, b, tol=1e-10, max_iter=100)}")
     print(f"Reference solutions: {solve(A, b)}")
\ No newline at end of file
@@ -2,40 +2,201 @@
 #   l1-q6, Successive over-relaxation (SOR)
 #   Author: Yi-Ming Ding
 #   Updated: Feb 19, 2025
+#   Reference:
+#       D. M. Young, Iterative Solution of Large Linear Systems (1971)
+#       L. A. Hageman and D. M. Young, Applied Iterative Methods (1981), chap. 7 & 9
 # ---------------------------------------------------------------------------------------------
 import numpy as np
 from scipy.linalg import solve
-from l1_q4 import gauss_seidel
+from l1_q4 import gauss_seidel, SweepKernel
+from krylov import cg, ssor_preconditioner
 
-def sor(A: np.ndarray, b: np.ndarray, omega: float, tol: float, max_iter: int, x0: np.ndarray=None) -> np.ndarray:
+"""
+    For consistently ordered matrices (e.g. the 5-point Laplacian in natural or red-black order),
+    the optimal relaxation factor is omega_opt = 2 / (1 + sqrt(1 - rho_J^2)), where rho_J is the
+    spectral radius of the Jacobi iteration. While omega < omega_opt, the ratio r of successive
+    updates tends to the dominant eigenvalue of the SOR iteration, which is linked to rho_J by
+        (r + omega - 1)^2 = r * (omega * rho_J)^2.
+    The adaptive procedure starts from Gauss-Seidel (omega = 1) and raises omega with every new
+    estimate of rho_J, until r drops to about omega - 1, the signature of omega_opt.
+"""
+
+def _adaptive_sor(kernel: SweepKernel, x: np.ndarray, b: np.ndarray, tol: float, max_iter: int, info: dict,
+                  settle: bool=False, wait: int=5, factor: float=0.75, stable: float=0.01) -> bool:
+    """
+    SOR sweeps with adaptively chosen omega (Hageman & Young, chap. 9), updating x and info in place.
+
+    r is the geometric mean of the update ratios since the last change of omega (skipping the first
+    few sweeps), which smooths out the transient that follows every change.
+
+    :param settle: stop as soon as omega has settled, instead of iterating until convergence
+    :param wait: number of sweeps skipped after every change of omega
+    :param factor: omega is re-estimated while r > (omega - 1)^factor
+    :param stable: r is trusted once it changes by less than stable * (1 - r) between sweeps
+    :return: whether the iteration converged
+    """
+    omega, since_change, first, ref_l2, prev_r = 1.0, 0, None, None, None
+    change = np.inf
+    while info["iterations"] < max_iter:
+        change = kernel.forward(x, b, omega)
+        info["iterations"] += 1
+        if first is None:
+            first = change
+        if change < tol:
+            break
+
+        since_change += 1
+        if since_change <= wait:
+            ref_l2, prev_r = kernel.last_update_l2, None
+            continue
+        r = (kernel.last_update_l2 / ref_l2) ** (1 / (since_change - wait))
+        settled = prev_r is not None and abs(r - prev_r) <= stable * (1 - r)
+        prev_r = r
+        if not 0 < r < 1 or not settled:
+            continue
+        if r > (omega - 1) ** factor:
+            rho_j = min((r + omega - 1) / (omega * np.sqrt(r)), 1 - 1e-12)
+            if info["rho_jacobi"] is None or rho_j > info["rho_jacobi"]:
+                info["rho_jacobi"] = rho_j
+                omega = 2 / (1 + np.sqrt(1 - rho_j ** 2))
+                since_change = 0
+        elif settle:
+            break
+
+    info["omega"] = omega
+    if info["rho_jacobi"] is not None:
+        rho_gs = info["rho_jacobi"] ** 2
+        info["iterations_gs_estimate"] = int(np.ceil(np.log(tol / first) / np.log(rho_gs))) if first > tol else 1
+    return change < tol
+
+def _report(info: dict):
+    # an estimate, not a measurement: it extrapolates Gauss-Seidel from rho_J^2, and the adaptive
+    # rho_J overshoots the true one, so it tends to overstate the saving (about 2x on a 40 x 40 Laplacian)
+    if info["iterations_gs_estimate"] is not None:
+        info["estimated_iterations_saved"] = max(info["iterations_gs_estimate"] - info["iterations"], 0)
+
+def sor(A: np.ndarray, b: np.ndarray, omega, tol: float, max_iter: int, x0: np.ndarray=None, ordering="natural",
+        full_output: bool=False):
     """
     Successive Over-Relaxation (SOR) method for solving Ax = b.
 
-    :param A:       the coefficient matrix A (must be square)
+    :param A:       the coefficient matrix A (must be square), dense or scipy.sparse
     :param b:       the right-hand side vector b
-    :param omega:   the relaxation factor (1 < omega < 2 for acceleration would be better)
+    :param omega:   the relaxation factor (1 < omega < 2 for acceleration would be better),
+                    or "auto" to estimate the optimal omega on the fly
     :param tol:     the required precision (tolerance for convergence)
     :param max_iter: maximum iteration count.
     :param x0:      initial guess for x
-    :return:        the solution vector x
+    :param ordering: sweep ordering or a prebuilt SweepKernel, see l1_q4.gauss_seidel
+    :param full_output: also return a dict with the iteration count, omega and an estimate of the
+                    number of iterations saved with respect to Gauss-Seidel (omega="auto" only),
+                    extrapolated from the estimated rho_J rather than measured
+    :return:        the solution vector x (and the info dict)
     """
-    assert A.shape[0] == A.shape[1]
-    assert omega > 1 and omega < 2
-    n = A.shape[0]
-    x = np.zeros(n) if x0 is None else x0.copy()
+    kernel = ordering if isinstance(ordering, SweepKernel) else SweepKernel(A, ordering)
+    b = np.asarray(b, dtype=np.float64)
+    x = np.zeros(kernel.n) if x0 is None else np.array(x0, dtype=np.float64)
+    info = {"omega": omega, "rho_jacobi": None, "iterations": 0, "iterations_gs_estimate": None, "estimated_iterations_saved": None}
+
+    if omega == "auto":
+        converged = _adaptive_sor(kernel, x, b, tol, max_iter, info)
+    else:
+        assert omega > 1 and omega < 2
+        converged = False
+        while not converged and info["iterations"] < max_iter:
+            info["iterations"] += 1
+            converged = kernel.forward(x, b, omega) < tol
+
+    if not converged:
+        raise ValueError(f"The algorithm did not converge within {max_iter} iterations. Final x: {x}")
+    _report(info)
+    return (x, info) if full_output else x
+
+def chebyshev_ssor(A: np.ndarray, b: np.ndarray, tol: float, max_iter: int, x0: np.ndarray=None, omega="auto",
+                   rho: float=None, ordering="natural", full_output: bool=False):
+    """
+    Symmetric SOR (a forward sweep followed by a backward sweep) accelerated by Chebyshev semi-iteration.
+
+    The eigenvalues of the SSOR iteration matrix are real and lie in [0, rho], so the extrapolated
+    step gamma * S(y) + (1 - gamma) * y with gamma = 2 / (2 - rho) has spectrum in [-sigma, sigma],
+    sigma = rho / (2 - rho), on which the Chebyshev recursion is optimal.
+
+    With omega="auto" or rho=None, rho_J is first estimated by adaptive SOR sweeps. In the natural
+    ordering, omega = 2 / (1 + sqrt(2 (1 - rho_J))) and rho follows from Young's bound
+    (1 - sqrt((1 - rho_J) / 2)) / (1 + sqrt((1 - rho_J) / 2)). With a coloring that bound does not
+    apply (the backward sweep repeats the last color), so omega = 1 and rho = rho_J^2, which is exact
+    for red-black orderings, where symmetric Gauss-Seidel has the spectrum of Gauss-Seidel.
+
+    :param A:       the coefficient matrix A (must be symmetric positive definite), dense or scipy.sparse
+    :param b:       the right-hand side vector b
+    :param tol:     the required precision (tolerance for convergence)
+    :param max_iter: maximum iteration count (one iteration = one symmetric sweep)
+    :param x0:      initial guess for x
+    :param omega:   the SSOR relaxation factor in (0, 2), or "auto" (see above)
+    :param rho:     spectral radius of the SSOR iteration, or None (see above)
+    :param ordering: sweep ordering or a prebuilt SweepKernel, see l1_q4.gauss_seidel
+    :param full_output: also return a dict with the iteration count, omega and the estimated
+                    number of iterations saved with respect to Gauss-Seidel
+    :return:        the solution vector x (and the info dict)
+    """
+    kernel = ordering if isinstance(ordering, SweepKernel) else SweepKernel(A, ordering)
+    b = np.asarray(b, dtype=np.float64)
+    y = np.zeros(kernel.n) if x0 is None else np.array(x0, dtype=np.float64)
+    info = {"omega": omega, "rho_jacobi": None, "rho_ssor": rho, "iterations": 0,
+            "iterations_gs_estimate": None, "estimated_iterations_saved": None}
+
+    if omega == "auto" or rho is None:
+        sor_info = dict(info, omega=None)
+        if _adaptive_sor(kernel, y, b, tol, max_iter, sor_info, settle=True):
+            info.update(iterations=sor_info["iterations"], omega=sor_info["omega"])
+            _report(info)
+            return (y, info) if full_output else y
+        if sor_info["rho_jacobi"] is None:
+            raise ValueError(f"The algorithm did not converge within {max_iter} iterations. Final x: {y}")
+        rho_j = sor_info["rho_jacobi"]
+        info.update(iterations=sor_info["iterations"], rho_jacobi=rho_j,
+                    iterations_gs_estimate=sor_info["iterations_gs_estimate"])
+        if kernel.colors is not None:
+            if omega == "auto":
+                omega = info["omega"] = 1.0
+            if rho is None:
+                rho = info["rho_ssor"] = rho_j ** 2
+        else:
+            if omega == "auto":
+                omega = info["omega"] = 2 / (1 + np.sqrt(2 * (1 - rho_j)))
+            if rho is None:
+                q = np.sqrt((1 - rho_j) / 2)
+                rho = info["rho_ssor"] = (1 - q) / (1 + q)
+    assert 0 < omega < 2 and 0 <= rho < 1
 
-    for _ in range(max_iter):
-        x_new = x.copy()
-        for i in range(n):
-            sum1 = np.dot(A[i, :i], x_new[:i])  # Use new values
-            sum2 = np.dot(A[i, i+1:], x[i+1:])  # Use old values
-            x_new[i] = (1 - omega) * x[i] + (omega / A[i, i]) * (b[i] - sum1 - sum2)
+    sigma = rho / (2 - rho)
+    gamma = 2 / (2 - rho)
+    s, y_prev, work = np.empty_like(y), y.copy(), np.empty_like(y)
 
-        if np.linalg.norm(x_new - x, ord=np.inf) < tol:
-            return x_new
-        x = x_new
+    # Chebyshev recursion: y_new = w * (gamma * (S(y) - y) + y - y_prev) + y_prev
+    converged, w, m = False, 1.0, 0
+    while not converged and info["iterations"] < max_iter:
+        w = 1.0 if m == 0 else (1 / (1 - sigma ** 2 / 2) if m == 1 else 1 / (1 - sigma ** 2 * w / 4))
+        s[:] = y
+        kernel.forward(s, b, omega)
+        kernel.backward(s, b, omega)
+        s -= y
+        s *= gamma
+        s += y
+        s -= y_prev
+        s *= w
+        s += y_prev                 # s = y_new
+        np.subtract(s, y, out=work)
+        y_prev[:] = y
+        y[:] = s
+        info["iterations"] += 1
+        m += 1
+        converged = np.abs(work, out=work).max() < tol
 
-    raise ValueError(f"The algorithm did not converge within {max_iter} iterations. Final x: {x}")
+    if not converged:
+        raise ValueError(f"The algorithm did not converge within {max_iter} iterations. Final x: {y}")
+    _report(info)
+    return (y, info) if full_output else y
 
 A = np.array([
     [1, 1, 0, 0, 0],
@@ -50,5 +211,10 @@ b = np.array([2, 4, 5, 6, 6])
 if __name__ == "__main__":
     x_sor = sor(A, b, omega=1.5, tol=1e-6, max_iter=10000)
     print(f"x_sor = {x_sor}")
+    x_auto, info = sor(A, b, omega="auto", tol=1e-6, max_iter=10000, full_output=True)
+    print(f"x_sor (auto omega = {info['omega']:.4f}, ~{info['estimated_iterations_saved']} iterations saved (estimate)) = {x_auto}")
+    x_cheb, info = chebyshev_ssor(A, b, tol=1e-6, max_iter=10000, full_output=True)
+    print(f"x_ssor (Chebyshev, {info['iterations']} iterations) = {x_cheb}")
     print(f"x_gs = {gauss_seidel(A, b, tol=1e-6, max_iter=10000)}")
-    print(f"Reference solutions: {solve(A, b)}")
\ No newline at end of file
+    print(f"x_cg (SSOR preconditioned) = {cg(A, b, tol=1e-10, max_iter=100, M=ssor_preconditioner(A, omega=1.5))}")
+    print(f"Reference solutions: {solve(A, b)}")
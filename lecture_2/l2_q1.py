@@ -5,11 +5,18 @@
 #   Reference: https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.bisect.html
 # ---------------------------------------------------------------------------------------------
 from scipy import optimize
-from numpy import exp, log
+from numpy import exp, log, linspace
+from batch_roots import bisect_batch
 
 f = lambda x: exp(x) * log(x) - x**2  # the function
 a, b = 1, 2     # the interval
 
 if __name__ == "__main__":
     root = optimize.bisect(f, a, b)
-    print(f"Approximate root: {root:.7f}")
\ No newline at end of file
+    print(f"Approximate root: {root:.7f}")
+
+    # the same equation with x^2 replaced by c x^2, solved for 10^5 values of c at once (see batch_roots.py)
+    g = lambda x, c: exp(x) * log(x) - c * x**2
+    c = linspace(0.5, 1.25, 10**5)
+    roots = bisect_batch(g, a, b, args=(c,))
+    print(f"Roots for c = {c[0]}, ..., {c[-1]}: {roots[0]:.7f}, ..., {roots[-1]:.7f}")
@@ -5,11 +5,18 @@
 #   Reference: https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.newton.html
 # ---------------------------------------------------------------------------------------------
 from scipy import optimize
-from numpy import exp, log
+from numpy import exp, log, linspace
+from batch_roots import secant_batch
 
 f = lambda x: exp(x) * log(x) - x**2
 a, b = 1, 2
 
 if __name__ == "__main__":
     root = optimize.newton(f, x0=a, x1=b)   # if we only pass it with x0 and x1, the secant method is used
-    print(f"Approximate root: {root:.7f}")
\ No newline at end of file
+    print(f"Approximate root: {root:.7f}")
+
+    # the same equation with x^2 replaced by c x^2, solved for 10^5 values of c at once (see batch_roots.py)
+    g = lambda x, c: exp(x) * log(x) - c * x**2
+    c = linspace(0.5, 1.25, 10**5)
+    roots = secant_batch(g, a, b, args=(c,))
+    print(f"Roots for c = {c[0]}, ..., {c[-1]}: {roots[0]:.7f}, ..., {roots[-1]:.7f}")
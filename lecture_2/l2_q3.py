@@ -1,9 +1,13 @@
 # ---------------------------------------------------------------------------------------------
 #   l2-q3, fixed-point iteration
 #   Author: Yi-Ming Ding
-#   Updated: Feb 26, 2025
+#   Updated: Oct 18, 2026
+#   Reference:
+#       H. F. Walker and P. Ni, Anderson acceleration for fixed-point iterations,
+#       SIAM J. Numer. Anal. 49, 1715 (2011)
 # ---------------------------------------------------------------------------------------------
 from typing import Callable
+import numpy as np
 from numpy import sqrt
 
 """
@@ -11,27 +15,162 @@ from numpy import sqrt
     we have two choices
         (i) x = sqrt(x+1)
         (ii) x = x^2 - 1
-    Notice that f(0) = -1 and f(2) = 5, thus the root is in (0, 5) 
+    Notice that f(0) = -1 and f(2) = 5, thus the root is in (0, 5)
+
+    The plain iteration x <- f(x) converges linearly, and only to attracting fixed points: from
+    x0 = 0.5, choice (ii) ends up in the 2-cycle 0, -1 and never converges. The accelerated methods:
+        aitken:     the plain sequence is kept, but the reported estimate is its Aitken delta-squared
+                    extrapolation x_k - (x_{k+1} - x_k)^2 / (x_{k+2} - 2 x_{k+1} + x_k); it cannot
+                    rescue a sequence that does not converge (the 2-cycle above extrapolates to -0.5),
+                    so a settled estimate only counts as converged if |f(x) - x| < tol
+        steffensen: restarts the plain iteration from every Aitken extrapolation (two calls of f per
+                    iteration); converges quadratically, to repelling fixed points as well
+        anderson:   x_{k+1} = f(x_k) - sum_i gamma_i (f(x_{k-i+1}) - f(x_{k-i})), where gamma fits the
+                    last `depth` differences of the residuals f(x) - x by least squares
+    The delta-squared extrapolation of aitken and steffensen acts on one scalar at a time, so they are
+    only offered for scalar equations; vector states (state_ndim > 0) use plain or anderson.
 """
 f = lambda x: sqrt(x + 1)
 g = lambda x: x**2 - 1
 
-def fixed_point_iter(f: Callable[[float], float], x0: float, tol: float=1e-5, max_itr: int=500) -> float:
+METHODS = ("plain", "aitken", "steffensen", "anderson")
+
+def _lane_max(a: np.ndarray) -> np.ndarray:
+    return np.abs(a).reshape(a.shape[0], -1).max(axis=1)
+
+def _aitken(x0: np.ndarray, x1: np.ndarray, x2: np.ndarray) -> np.ndarray:
+    denominator = x2 - 2 * x1 + x0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator != 0, x0 - (x1 - x0)**2 / denominator, x2)
+
+def fixed_point_iter(f: Callable[[np.ndarray], np.ndarray], x0, tol: float=1e-5, max_itr: int=500,
+                     method: str="plain", depth: int=5, state_ndim: int=0, trace: bool=False) -> tuple:
     """
-    :param f: the equation to solve
-    :param x0: the initial guess
-    :param tol: the tolerance
+    Iterate x = f(x) for a whole array of starting points at once; every lane stops on its own.
+
+    :param f: the equation to solve, applied to arrays of lanes (elementwise for scalar equations)
+    :param x0: the initial guess, a scalar or an array of shape batch_shape + state_shape
+    :param tol: the tolerance on the step between successive estimates
     :param max_itr: the maximum number of iterations
-    :return: the solution
+    :param method: "plain", "aitken", "steffensen" or "anderson"
+    :param depth: number of previous steps used by Anderson acceleration
+    :param state_ndim: number of trailing axes of x0 that form one state (0 for scalar equations);
+                       f maps arrays of shape (lanes,) + state_shape to the same shape. Only "plain"
+                       and "anderson" accept state_ndim > 0: the componentwise delta-squared step of
+                       "aitken" and "steffensen" is not valid for coupled components
+    :param trace: also return the history of the estimates, preallocated with shape
+                  (max_itr + 1,) + x0.shape and cut after the last iteration; NaN once a lane stopped
+    :return: the solutions, the per-lane convergence flags (and the history)
     """
-    for _ in range(max_itr):
-        x1 = f(x0)
-        if abs(x1 - x0) < tol:
-            return x1
-        x0 = x1         # update x0
-    raise ValueError("Max iterations exceeded, no convergence.")
+    assert method in METHODS
+    if method in ("aitken", "steffensen") and state_ndim > 0:
+        raise ValueError(f"Method {method!r} extrapolates scalars only, use 'plain' or 'anderson' for state_ndim > 0")
+    x = np.array(x0, dtype=np.float64)
+    batch_shape, state_shape = x.shape[:x.ndim - state_ndim], x.shape[x.ndim - state_ndim:]
+    x = x.reshape((-1,) + state_shape)
+    n = x.shape[0]
+    roots = x.copy()
+    converged = np.zeros(n, dtype=bool)
+    history = np.full((max_itr + 1,) + x.shape, np.nan) if trace else None
+    if trace:
+        history[0] = x
+
+    idx = np.arange(n)
+    state = {"x": x}
+    if method == "aitken":
+        state["x1"] = f(x)                  # the last two terms of the plain sequence
+        state["estimate"] = x.copy()
+    elif method == "anderson":
+        state["g"] = f(x) - x               # residual of the current iterate
+        state["dx"] = np.zeros((n, depth, x[0].size))
+        state["dg"] = np.zeros((n, depth, x[0].size))
+
+    itr = 0
+    with np.errstate(over="ignore", invalid="ignore"):     # diverging lanes are dropped below
+        while itr < max_itr and idx.size > 0:
+            itr += 1
+            x = state["x"]
+            if method == "plain":
+                x_new = estimate = f(x)
+                step = x_new - x
+            elif method == "steffensen":
+                x1 = f(x)
+                x_new = estimate = _aitken(x, x1, f(x1))
+                step = x_new - x
+            elif method == "aitken":
+                x1 = state["x1"]
+                x2 = f(x1)
+                estimate = _aitken(x, x1, x2)
+                step = estimate - state["estimate"]
+                x_new, state["x1"], state["estimate"] = x1, x2, estimate
+            else:
+                filled = min(itr - 1, depth)
+                g_cur = state["g"].reshape(x.shape[0], -1)
+                x_flat = x.reshape(x.shape[0], -1) + g_cur
+                if filled > 0:
+                    dg = state["dg"][:, :filled]
+                    normal = dg @ dg.transpose(0, 2, 1)
+                    scale = np.einsum("kii->k", normal) * 1e-10 + 1e-300     # Tikhonov regularization
+                    normal += scale[:, None, None] * np.eye(filled)
+                    gamma = np.linalg.solve(normal, (dg @ g_cur[:, :, None]))[:, :, 0]
+                    x_flat -= np.einsum("kf,kfd->kd", gamma, state["dx"][:, :filled] + dg)
+                x_new = x_flat.reshape(x.shape)
+                g_new = f(x_new) - x_new
+                column = (itr - 1) % depth
+                state["dx"][:, column] = (x_new - x).reshape(x.shape[0], -1)
+                state["dg"][:, column] = (g_new - state["g"]).reshape(x.shape[0], -1)
+                state["g"] = g_new
+                estimate = x_new + g_new
+                step = g_new
+            state["x"] = x_new
+
+            roots[idx] = estimate
+            if trace:
+                history[itr, idx] = estimate
+            change = _lane_max(step)
+            done = change < tol
+            if method == "aitken" and done.any():
+                candidates = np.flatnonzero(done)
+                settled = estimate[candidates]
+                done[candidates] = _lane_max(f(settled) - settled) < tol
+                converged[idx[done]] = True
+                done[candidates] = True      # a settled estimate that is no fixed point will not improve
+            else:
+                converged[idx[done]] = True
+            keep = ~done & np.isfinite(change)    # diverging lanes are dropped as well
+            if not keep.all():
+                idx = idx[keep]
+                state = {key: value[keep] for key, value in state.items()}
+
+    roots = roots.reshape(batch_shape + state_shape)[()]
+    converged = converged.reshape(batch_shape)[()]
+    if trace:
+        return roots, converged, history[:itr + 1].reshape((itr + 1,) + batch_shape + state_shape)
+    return roots, converged
 
 if __name__ == "__main__":
     x0 = 0.5
-    root = fixed_point_iter(g, x0)
-    print(f"Approximate root: {root:.7f}")
\ No newline at end of file
+    for method in METHODS:
+        root, converged = fixed_point_iter(g, x0, method=method)
+        print(f"x = x^2 - 1, {method:>10s}: converged = {converged}, approximate root: {root:.7f}")
+
+    # many starting points at once: (i) converges to the golden ratio from every x0 > -1
+    x0 = np.linspace(-0.9, 5, 10**5)
+    for method in METHODS:
+        roots, converged = fixed_point_iter(f, x0, tol=1e-10, method=method)
+        print(f"x = sqrt(x + 1), {method:>10s}: {converged.sum()} of {x0.size} converged, "
+              f"max error = {np.abs(roots - (1 + sqrt(5)) / 2).max():.2e}")
+
+    # a vector state: the linear contraction x <- A x + b in 2-D, for 1000 starting points
+    A, b = np.array([[0.5, 0.4], [-0.3, 0.6]]), np.array([1.0, -2.0])
+    exact = np.linalg.solve(np.eye(2) - A, b)
+    x0 = np.random.default_rng(42).uniform(-10, 10, (1000, 2))
+    for method in METHODS:
+        try:
+            roots, converged = fixed_point_iter(lambda x: x @ A.T + b, x0, tol=1e-10, method=method, state_ndim=1)
+        except ValueError as error:
+            print(f"x = A x + b, {method:>10s}: {error}")
+            continue
+        assert converged.all() and np.abs(roots - exact).max() < 1e-8
+        print(f"x = A x + b, {method:>10s}: {converged.sum()} of {x0.shape[0]} converged, "
+              f"max error = {np.abs(roots - exact).max():.2e}")
@@ -7,16 +7,18 @@
 #       https://docs.jax.dev/en/latest/_autosummary/jax.grad.html#jax.grad
 # ---------------------------------------------------------------------------------------------
 from scipy import optimize
-from jax import grad
+from jax import grad, jit
 
 f = lambda x: x**3 + 2 * x**2 + 3 * x - 1
 f_prime = lambda x: 3 * x**2 + 4 * x + 3    # manually write the derivative
 f_grad = grad(f)    # (recommended) automatic differentiation with jax
+f_grad_jit = jit(f_grad)    # compiled once: SciPy calls fprime one scalar at a time
+f_grad_scalar = lambda x: float(f_grad_jit(float(x)))
 
 if __name__ == "__main__":
     x0 = 0.5
     root = optimize.newton(f, x0=x0, fprime=f_prime)
     print(f"Approximate root (manual f'): {root:.7f}")
 
-    root = optimize.newton(f, x0=x0, fprime=f_grad)
+    root = optimize.newton(f, x0=x0, fprime=f_grad_scalar)
     print(f"Approximate root (autodiff f'): {root:.7f}")
\ No newline at end of file
@@ -1,10 +1,11 @@
 # ---------------------------------------------------------------------------------------------
 #   l2-q5, gradient descent for system of nonlinear equations
 #   Author: Yi-Ming Ding
-#   Updated: Feb 26, 2025
+#   Updated: Oct 18, 2026
 # ---------------------------------------------------------------------------------------------
+from typing import Callable
 import jax.numpy as jnp
-from jax import grad
+from optimizers import METHODS, minimize, print_progress
 
 def system(x: jnp.ndarray) -> jnp.ndarray:
     return jnp.array([
@@ -17,30 +18,33 @@ def loss_func(x: jnp.ndarray) -> float:
     residuals = system(x)
     return jnp.sum(residuals ** 2)
 
-grad_func = grad(loss_func)
-
-def steepest_descent(loss_func, grad_func, x0: jnp.ndarray, tol: float = 1e-6, max_itr: int = 1000) -> tuple[jnp.ndarray]:
+def steepest_descent(loss_func, grad_func, x0: jnp.ndarray, tol: float = 1e-6, max_itr: int = 1000,
+                     callback: Callable = print_progress, stride: int = 100) -> tuple[jnp.ndarray]:
     """
+    Steepest descent with the Barzilai-Borwein step, compiled as a single loop (see optimizers.py).
+
     :param loss_func: the loss function
-    :param grad_func: the gradient function of the loss function
+    :param grad_func: an explicit gradient of the loss function (two traced passes), or None for a
+                      single jax.value_and_grad pass
     :param x0: the initial guess
     :param tol: the tolerance
     :param max_itr: maximum number of iterations
+    :param callback: called as callback(t, loss, x) every `stride` iterations, None for no output
+    :param stride: the number of iterations between two calls of callback
     :return: the final solution
     """
-    x = x0.copy()
-    for t in range(max_itr):
-        gradient = grad_func(x)   # the gradient
-        alpha = loss_func(x) / jnp.sum(gradient ** 2)  # compute alpha (the learning rate)
-        x = x - alpha * gradient
-        loss = loss_func(x)
-        if t % 100 == 0:
-            print(f"t = {t}, loss = {loss}")
-        if loss < tol:
-            return x
-    raise Exception("Maximum iterations reached without convergence.")
+    x, info = minimize(loss_func, x0, method="bb", tol=tol, max_itr=max_itr, callback=callback, stride=stride,
+                       grad_func=grad_func)
+    if not info["converged"]:
+        raise Exception("Maximum iterations reached without convergence.")
+    return x
 
 if __name__ == "__main__":
     x0 = jnp.array([2.0, 5.0, -3.0])
-    sol = steepest_descent(loss_func, grad_func, x0)
-    print("Approximate solution:", sol)
\ No newline at end of file
+    sol = steepest_descent(loss_func, None, x0)
+    print("Approximate solution:", sol)
+
+    for method in METHODS:
+        sol, info = minimize(loss_func, x0, method=method, tol=1e-6, max_itr=20000, callback=None)
+        print(f"{method:>5s}: converged = {info['converged']} after {info['iterations']} iterations, "
+              f"loss = {info['loss']:.2e}, x = {sol}")
@@ -1,13 +1,31 @@
 # ---------------------------------------------------------------------------------------------
 #   l2-q5, monte carlo algorithm for system of nonlinear equations
 #   Author: Yi-Ming Ding
-#   Updated: Feb 26, 2025
+#   Updated: Oct 18, 2026
+#   Reference:
+#       D. J. Earl and M. W. Deem, Parallel tempering: theory, applications, and new perspectives,
+#       Phys. Chem. Chem. Phys. 7, 3910 (2005)
 # ---------------------------------------------------------------------------------------------
+import time
+from functools import lru_cache
+from typing import Callable
+import jax
 import jax.numpy as jnp
 import numpy as np
-from jax.numpy import exp
 
-np.random.seed(42)  # set the seed of pseudo random number generator
+"""
+    parallel_tempering advances many Metropolis chains at once: the replicas form an array of shape
+    (n_chains, n_temperatures, dim), every step proposes a move of length lr for all of them, evaluates
+    the batched loss once and accepts with probability min(1, exp(-beta * delta_loss)). The loss of
+    the current state is kept, so that only the proposals are evaluated.
+
+    Every swap_every steps, neighbouring temperatures of each chain exchange their states with
+    probability min(1, exp((beta_k - beta_{k+1}) (loss_k - loss_{k+1}))) (parallel tempering), which
+    lets the cold replicas escape from local minima through the hot ones.
+
+    The batched loss is not written by hand: batched(loss_func) compiles jax.vmap(loss_func) once, so
+    the single definition of the system is the only one.
+"""
 
 def system(x: jnp.ndarray) -> jnp.ndarray:
     return jnp.array([
@@ -16,46 +34,130 @@ def system(x: jnp.ndarray) -> jnp.ndarray:
         2 * x[1] * x[2] + 40 * x[0],
     ])
 
-def loss_func(x: jnp.ndarray) -> float:
+def loss_func(x: jnp.ndarray) -> jnp.ndarray:
     residuals = system(x)
-    return float(jnp.sum(residuals ** 2))
+    return jnp.sum(residuals ** 2)
+
+@lru_cache(maxsize=None)
+def batched(loss_func: Callable) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    :param loss_func: a scalar loss of one point, written with jax.numpy
+    :return: a function mapping points of shape (..., dim) to their losses, shape (...), in float64
+    """
+    compiled = jax.jit(jax.vmap(loss_func))
 
-def rand_move(lr: float, vec_length: int) -> jnp.ndarray:
-    vec = np.random.uniform(-1, 1, vec_length)
-    vec = vec / jnp.linalg.norm(vec) * lr
-    return jnp.array(vec)
+    def evaluate(x: np.ndarray) -> np.ndarray:
+        with jax.enable_x64(True):
+            losses = compiled(jnp.asarray(x.reshape(-1, x.shape[-1]), dtype=jnp.float64))
+        return np.array(losses).reshape(x.shape[:-1])      # a writable copy
 
-def monte_carlo(loss_func, x0: jnp.ndarray, beta: float =10, lr: float=1e-2, tol: float = 1e-3, max_itr: int = 5000) -> tuple[jnp.ndarray]:
+    return evaluate
+
+loss_batch = batched(loss_func)
+
+def parallel_tempering(loss_batch: Callable[[np.ndarray], np.ndarray], x0: np.ndarray, betas, lr=1e-2,
+                       n_chains: int=1, tol: float=1e-3, max_itr: int=5000, swap_every: int=10,
+                       rng: np.random.Generator=None, callback: Callable=None, stride: int=250) -> tuple:
     """
-    :param loss_func: the loss function
+    :param loss_batch: the loss function, mapping points of shape (..., dim) to losses of shape (...)
+    :param x0: the initial guess, shape (dim,), (n_chains, dim) or (n_chains, n_temperatures, dim)
+    :param betas: the inverse temperatures, one per replica of a chain (a single value for plain Metropolis)
+    :param lr: the step of each move, a scalar or one value per temperature
+    :param n_chains: the number of independent chains (taken from x0 if it has a chain axis)
+    :param tol: stop once the loss of any replica drops below tol
+    :param max_itr: maximum number of iterations
+    :param swap_every: the number of steps between two rounds of replica exchanges
+    :param rng: the random number generator, np.random.default_rng() if None
+    :param callback: called as callback(t, losses) every `stride` steps, None for no output
+    :param stride: the number of steps between two calls of callback
+    :return: the best point found and a dict with its loss, the iteration count, whether the loss
+             dropped below tol, the final states and losses of all replicas, the acceptance rates
+             per replica (n_chains, n_temperatures) and per temperature, and the acceptance rates
+             of the swaps between neighbouring temperatures
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    betas = np.atleast_1d(np.asarray(betas, dtype=np.float64))
+    n_temps = betas.size
+    x0 = np.asarray(x0, dtype=np.float64)
+    if x0.ndim >= 2:
+        n_chains = x0.shape[0]
+        x0 = x0[:, None, :] if x0.ndim == 2 else x0
+    x = np.broadcast_to(x0, (n_chains, n_temps, x0.shape[-1])).copy()
+    step = np.broadcast_to(np.asarray(lr, dtype=np.float64), (n_temps,))[:, None]
+
+    losses = loss_batch(x)
+    accepted = np.zeros((n_chains, n_temps), dtype=int)
+    swaps_tried, swaps_accepted = np.zeros(max(n_temps - 1, 0), dtype=int), np.zeros(max(n_temps - 1, 0), dtype=int)
+    t = 0
+    while t < max_itr and losses.min() >= tol:
+        move = rng.standard_normal(x.shape)
+        move *= step / np.linalg.norm(move, axis=-1, keepdims=True)
+        move += x                                                   # move is now the proposal
+        proposal_losses = loss_batch(move)
+        with np.errstate(over="ignore", invalid="ignore"):
+            accept = np.log(rng.random((n_chains, n_temps))) < -betas * (proposal_losses - losses)
+        x[accept] = move[accept]
+        losses[accept] = proposal_losses[accept]
+        accepted += accept
+        t += 1
+
+        if n_temps > 1 and t % swap_every == 0:
+            k = np.arange((t // swap_every) % 2, n_temps - 1, 2)   # alternate even and odd pairs
+            log_ratio = (betas[k] - betas[k + 1]) * (losses[:, k] - losses[:, k + 1])
+            swap = np.log(rng.random(log_ratio.shape)) < log_ratio
+            chain, pair = np.nonzero(swap)
+            lower, upper = k[pair], k[pair] + 1
+            x[chain, lower], x[chain, upper] = x[chain, upper], x[chain, lower]
+            losses[chain, lower], losses[chain, upper] = losses[chain, upper], losses[chain, lower]
+            swaps_tried[k] += n_chains
+            swaps_accepted[k] += swap.sum(axis=0)
+
+        if callback is not None and t % stride == 0:
+            callback(t, losses)
+
+    best = np.unravel_index(np.argmin(losses), losses.shape)
+    acceptance = accepted / max(t, 1)
+    return x[best].copy(), {"loss": float(losses[best]), "iterations": t, "converged": bool(losses[best] < tol),
+                            "x": x, "losses": losses, "acceptance": acceptance,
+                            "acceptance_per_temperature": acceptance.mean(axis=0),
+                            "swap_acceptance": swaps_accepted / np.maximum(swaps_tried, 1)}
+
+def monte_carlo(loss_func, x0: jnp.ndarray, beta: float =10, lr: float=1e-2, tol: float = 1e-3, max_itr: int = 5000,
+                rng: np.random.Generator=None) -> tuple[jnp.ndarray]:
+    """
+    :param loss_func: the loss function, written with jax.numpy
     :param x0: the initial guess
     :param beta: the temperature factor, which should be chosen carefully
     :param lr: the learning rate, or the step of each move
     :param tol: the tolerance
     :param max_itr: maximum number of iterations
+    :param rng: the random number generator, np.random.default_rng(42) if None
     :return: the final solution
     """
-    x = x0.copy()
-    vec_length = x.shape[0]
-    for t in range(max_itr):
-        move = rand_move(lr, vec_length)    # randomly choose the next move
-        loss_diff = loss_func(x + move) - loss_func(x)  # compute the difference
-
-        # standard Metropolis algorithm here
-        if np.random.rand() < min(1.0, float(exp(-beta * loss_diff))):
-            x = x + move
-
-        loss = loss_func(x)
-        if t % 250 == 0:
-            print(f"t = {t}, loss = {loss}")
-
-        if loss < tol:
-            print(f"Final loss = {loss}")
-            return x
+    # standard Metropolis algorithm here: a single chain at a single temperature
+    report = lambda t, losses: print(f"t = {t}, loss = {losses.min()}")
+    x, info = parallel_tempering(batched(loss_func), np.asarray(x0), beta, lr=lr, tol=tol, max_itr=max_itr,
+                                 rng=np.random.default_rng(42) if rng is None else rng, callback=report)
+    if info["converged"]:
+        print(f"Final loss = {info['loss']}")
+        return jnp.asarray(x)
 
     raise Exception("Maximum iterations reached without convergence.")
 
 if __name__ == '__main__':
     x0 = jnp.array([2.0, 5.0, -3.0])
+    start = time.perf_counter()
     sol = monte_carlo(loss_func, x0, beta=10, tol=1e-2, lr=1e-2, max_itr=10000)
-    print("Approximate solution:", sol)
\ No newline at end of file
+    print("Approximate solution:", sol)
+    print(f"Single chain: {time.perf_counter() - start:.2f} s")
+
+    # 256 chains, each with 6 replicas on a geometric temperature ladder; hot replicas take larger steps
+    betas = np.geomspace(10, 0.01, 6)
+    start = time.perf_counter()
+    x, info = parallel_tempering(loss_batch, np.asarray(x0), betas, lr=1e-2 * np.sqrt(betas[0] / betas), n_chains=256,
+                                 tol=1e-2, max_itr=10000, rng=np.random.default_rng(42))
+    elapsed = time.perf_counter() - start
+    print(f"Parallel tempering: {elapsed:.2f} s, {info['iterations']} steps, best loss {info['loss']:.2e} at {x}")
+    print(f"Time per accepted move: {elapsed / info['acceptance'].sum() / info['iterations']:.2e} s")
+    print(f"Acceptance per temperature: {np.round(info['acceptance_per_temperature'], 3)}")
+    print(f"Swap acceptance: {np.round(info['swap_acceptance'], 3)}")
@@ -5,13 +5,45 @@
 #   Reference:
 #       https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.root.html
 #       https://docs.jax.dev/en/latest/_autosummary/jax.jacfwd.html
+#       https://docs.jax.dev/en/latest/_autosummary/jax.lax.while_loop.html
+#       J. Nocedal and S. J. Wright, Numerical Optimization, 2nd ed. (2006), chap. 3 & 11
+#       D. A. Knoll and D. E. Keyes, Jacobian-free Newton-Krylov methods, J. Comput. Phys. 193, 357 (2004)
+#       S. C. Eisenstat and H. F. Walker, Choosing the forcing terms in an inexact Newton method,
+#       SIAM J. Sci. Comput. 17, 16 (1996)
+#       A. H. Gebremedhin, F. Manne and A. Pothen, What color is your Jacobian?, SIAM Rev. 47, 629 (2005)
 # ---------------------------------------------------------------------------------------------
+from functools import lru_cache, partial
+import time
 from typing import Callable
+import jax
 import jax.numpy as jnp
-from jax import jacfwd
+from jax import jacfwd, lax, vmap
 from scipy.optimize import root
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator, gmres, splu, spsolve
 import numpy as np
 
+"""
+    Newton's method converges only from a good initial guess, so instead of trying guesses one by
+    one, newton_multistart runs hundreds of them in a single compiled call: the iteration for one
+    guess is a lax.while_loop, vmapped over the guesses and compiled with jax.jit. The compiled
+    function is cached by jax for every (system, shape of the guesses, max_itr, max_halvings), so
+    only the first call with a new combination pays for the compilation.
+
+    The Newton step delta = -J^{-1} F is damped by backtracking: the step length t = 1, 1/2, 1/4, ...
+    is halved until the merit function |F|^2 decreases enough (Armijo condition), which keeps the
+    iteration from being thrown far away where J is nearly singular.
+
+    The dense Jacobian costs O(n^2) memory and its LU O(n^3) time, which rules out large discretized
+    PDEs. newton_krylov offers two alternatives, both in double precision:
+        jfnk:     the Newton equation J delta = -F is solved by GMRES, which only needs the products
+                  J v, computed by jax.jvp without ever forming J. The inner tolerance eta follows the
+                  Eisenstat-Walker forcing terms: loose far from the root, tight close to it.
+        colored:  for a known sparsity pattern, columns that share no row get the same color, and one
+                  jvp per color (a handful for a stencil) yields all the non-zeros of the sparse J,
+                  which is then factorized by a sparse direct solver.
+"""
+
 def system(x: jnp.ndarray) -> jnp.ndarray:
     return jnp.array([
         x[0] - 5 * x[1]**2 + 7 * x[2]**2 + 12,
@@ -19,16 +51,22 @@ def system(x: jnp.ndarray) -> jnp.ndarray:
         2 * x[1] * x[2] + 40 * x[0],
     ])
 
-jacobian = lambda x: jacfwd(system)(x)
+jacobian = jacfwd(system)    # build the transformation once, not on every call
 
-def newton_iter(system: Callable[[jnp.ndarray], jnp.ndarray], x0: jnp.ndarray, tol: float=1e-5, max_itr: int=500) -> tuple[jnp.ndarray]:
+def newton_iter(system: Callable[[jnp.ndarray], jnp.ndarray], x0: jnp.ndarray, tol: float=1e-5, max_itr: int=500,
+                mode: str="dense", sparsity=None, M=None) -> tuple[jnp.ndarray]:
     """
     :param system: the system of nonlinear equations
     :param x0: the initial guess
     :param tol: the convergence tolerance
     :param max_itr: the maximum number of iterations
+    :param mode: "dense" (jacfwd and jnp.linalg.solve), "jfnk" or "colored" (see newton_krylov)
+    :param sparsity: the sparsity pattern of the Jacobian, for mode="colored"
+    :param M: a preconditioner for the GMRES solves of mode="jfnk"
     :return: the solution
     """
+    if mode != "dense":
+        return newton_krylov(system, x0, tol=tol, max_itr=max_itr, mode=mode, sparsity=sparsity, M=M)
     x = x0.copy()
     for i in range(max_itr):
         A = jacobian(x)
@@ -41,6 +79,175 @@ def newton_iter(system: Callable[[jnp.ndarray], jnp.ndarray], x0: jnp.ndarray, t
 
     raise ValueError("Max iterations exceeded, no convergence.")
 
+@lru_cache(maxsize=None)
+def _compiled(system: Callable) -> tuple:
+    jvp = lambda x, v: jax.jvp(system, (x,), (v,))[1]
+    return jax.jit(system), jax.jit(jvp), jax.jit(vmap(jvp, in_axes=(None, 0)))
+
+def column_coloring(sparsity) -> np.ndarray:
+    """
+    Greedy coloring of the columns of a sparse matrix, such that columns of the same color have no
+    non-zero in a common row.
+
+    :param sparsity: the sparsity pattern (any scipy.sparse matrix or dense array)
+    :return: the color of every column, 0, 1, ...
+    """
+    pattern = sp.csr_matrix(sparsity, dtype=np.float64)
+    pattern.data[:] = 1
+    conflicts = (pattern.T @ pattern).tocsr()       # columns sharing at least one row
+    colors = np.full(conflicts.shape[0], -1)
+    for j in range(conflicts.shape[0]):
+        taken = colors[conflicts.indices[conflicts.indptr[j]:conflicts.indptr[j + 1]]]
+        free = np.ones(taken.size + 1, dtype=bool)
+        free[taken[(taken >= 0) & (taken <= taken.size)]] = False
+        colors[j] = np.argmax(free)
+    return colors
+
+def colored_jacobian(system: Callable, x: np.ndarray, sparsity, colors: np.ndarray) -> sp.csr_matrix:
+    """
+    :param system: the system of nonlinear equations
+    :param x: the point where the Jacobian is evaluated
+    :param sparsity: the sparsity pattern of the Jacobian
+    :param colors: the column coloring of the pattern, see column_coloring
+    :return: the sparse Jacobian, from one Jacobian-vector product per color
+    """
+    n = colors.size
+    seeds = np.zeros((colors.max() + 1, n))
+    seeds[colors, np.arange(n)] = 1
+    compressed = np.asarray(_compiled(system)[2](x, seeds))     # row c holds the sum of the columns of color c
+    pattern = sp.coo_matrix(sparsity)
+    values = compressed[colors[pattern.col], pattern.row]
+    return sp.csr_matrix((values, (pattern.row, pattern.col)), shape=(n, n))
+
+def newton_krylov(system: Callable[[jnp.ndarray], jnp.ndarray], x0: np.ndarray, tol: float=1e-8, max_itr: int=50,
+                  mode: str="jfnk", sparsity=None, M=None, eta_max: float=0.9, restart: int=50,
+                  max_inner: int=1000, full_output: bool=False):
+    """
+    Inexact Newton method for large systems, without the dense Jacobian.
+
+    :param system: the system of nonlinear equations (must be hashable, e.g. a module-level function)
+    :param x0: the initial guess
+    :param tol: the convergence tolerance on the norm of the Newton step
+    :param max_itr: the maximum number of Newton iterations
+    :param mode: "jfnk" (GMRES on Jacobian-vector products) or "colored" (sparse Jacobian by coloring)
+    :param sparsity: the sparsity pattern of the Jacobian, required for mode="colored"
+    :param M: a preconditioner (approximation of J^{-1}, e.g. a LinearOperator) for mode="jfnk"
+    :param eta_max: the largest forcing term, i.e. the loosest relative tolerance of GMRES
+    :param restart: the GMRES restart length
+    :param max_inner: the maximum number of GMRES iterations per Newton step
+    :param full_output: also return a dict with the iteration counts, residual norms and forcing terms
+    :return: the solution (and the info dict)
+    """
+    assert mode in ("jfnk", "colored")
+    with jax.enable_x64(True):
+        F, jvp, _ = _compiled(system)
+        x = np.array(x0, dtype=np.float64)
+        n = x.size
+        colors = column_coloring(sparsity) if mode == "colored" else None
+        f = np.asarray(F(x))
+        info = {"iterations": 0, "linear_iterations": 0, "residuals": [np.linalg.norm(f)], "etas": []}
+        eta = eta_max
+
+        def count(_):
+            info["linear_iterations"] += 1
+
+        for _ in range(max_itr):
+            if mode == "jfnk":
+                J = LinearOperator((n, n), matvec=lambda v: np.asarray(jvp(x, v)), dtype=np.float64)
+                delta, _ = gmres(J, -f, rtol=eta, restart=restart, maxiter=max(max_inner // restart, 1), M=M,
+                                 callback=count, callback_type="pr_norm")
+                info["etas"].append(eta)
+            else:
+                delta = spsolve(colored_jacobian(system, x, sparsity, colors).tocsc(), -f)
+            x += delta
+            f = np.asarray(F(x))
+            info["iterations"] += 1
+            info["residuals"].append(np.linalg.norm(f))
+            if np.linalg.norm(delta) < tol:
+                return (x, info) if full_output else x
+
+            # Eisenstat-Walker choice 2 (gamma = 0.9, alpha = 2), safeguarded against a sudden drop
+            eta_new = 0.9 * (info["residuals"][-1] / info["residuals"][-2]) ** 2
+            if 0.9 * eta ** 2 > 0.1:
+                eta_new = max(eta_new, 0.9 * eta ** 2)
+            eta = min(eta_new, eta_max)
+
+    raise ValueError("Max iterations exceeded, no convergence.")
+
+def bratu(u: jnp.ndarray, lam: float=6.0) -> jnp.ndarray:
+    """
+    Discretized Bratu problem -laplacian(u) = lam exp(u) on the unit square, u = 0 on the boundary,
+    with the 5-point stencil on an m x m grid of interior points (u has m^2 entries).
+    """
+    m = int(round(np.sqrt(u.size)))
+    h = 1 / (m + 1)
+    p = jnp.pad(u.reshape(m, m), 1)
+    laplacian = 4 * p[1:-1, 1:-1] - p[:-2, 1:-1] - p[2:, 1:-1] - p[1:-1, :-2] - p[1:-1, 2:]
+    return (laplacian - h**2 * lam * jnp.exp(p[1:-1, 1:-1])).ravel()
+
+def laplacian_2d(m: int) -> sp.csr_matrix:
+    T = sp.diags([-1, 4, -1], [-1, 0, 1], shape=(m, m), dtype=np.float64)
+    S = sp.diags([1, 1], [-1, 1], shape=(m, m), dtype=np.float64)
+    return (sp.kron(sp.identity(m), T) - sp.kron(S, sp.identity(m))).tocsr()
+
+@partial(jax.jit, static_argnames=("system", "max_itr", "max_halvings"))
+def newton_multistart(system: Callable[[jnp.ndarray], jnp.ndarray], x0: jnp.ndarray, tol: float=1e-5,
+                      max_itr: int=500, max_halvings: int=20) -> tuple:
+    """
+    :param system: the system of nonlinear equations (must be hashable, e.g. a module-level function)
+    :param x0: the initial guesses, one per row
+    :param tol: the convergence tolerance on the norm of the step
+    :param max_itr: the maximum number of iterations
+    :param max_halvings: the maximum number of step halvings per iteration
+    :return: the final iterates, the per-guess convergence mask (step below tol, |F| below sqrt(tol)
+             and finite) and the iteration counts
+    """
+    jac = jacfwd(system)
+    merit = lambda x: jnp.sum(system(x) ** 2)
+
+    def solve_one(x):
+        def line_search(x, delta, m):
+            def cond(state):
+                t, m_new = state
+                return (m_new > (1 - 1e-4 * t) * m) & (t > 2.0 ** -max_halvings)
+
+            def body(state):
+                t, _ = state
+                return t / 2, merit(x + t / 2 * delta)
+
+            t, _ = lax.while_loop(cond, body, (jnp.ones_like(m), merit(x + delta)))
+            return t
+
+        def cond(state):
+            _, k, done = state
+            return ~done & (k < max_itr)
+
+        def body(state):
+            x, k, _ = state
+            delta = jnp.linalg.solve(jac(x), -system(x))
+            step = line_search(x, delta, merit(x)) * delta
+            size = jnp.linalg.norm(step)
+            return x + step, k + 1, (size < tol) | ~jnp.isfinite(size)    # stop on convergence or breakdown
+
+        x, k, _ = lax.while_loop(cond, body, (x, 0, False))
+        converged = jnp.all(jnp.isfinite(x)) & (jnp.linalg.norm(system(x)) < jnp.sqrt(tol)) & (k < max_itr)
+        return x, converged, k
+
+    return vmap(solve_one)(x0)
+
+def distinct_roots(x: np.ndarray, converged: np.ndarray, tol: float=1e-3) -> np.ndarray:
+    """
+    :param x: the final iterates of newton_multistart
+    :param converged: the convergence mask of newton_multistart
+    :param tol: roots closer than tol (relative to their size) are considered the same
+    :return: the distinct converged roots, one per row
+    """
+    roots = []
+    for r in np.asarray(x)[np.asarray(converged)]:
+        if all(np.linalg.norm(r - s) > tol * max(1.0, np.linalg.norm(s)) for s in roots):
+            roots.append(r)
+    return np.array(roots).reshape(-1, x.shape[1])
+
 if __name__ == "__main__":
     x0 = jnp.array([1.5, 5.5, -2.])        # you may need many trials to converge with newton method
 
@@ -49,4 +256,25 @@ if __name__ == "__main__":
 
     sol = newton_iter(system, x0)
     print(f"Approximate solutions with Newton method: {sol}")
-    print(f"Check equations: f = {system(sol)}")
\ No newline at end of file
+    print(f"Check equations: f = {system(sol)}")
+
+    # 512 random initial guesses in one compiled call
+    x0s = jax.random.uniform(jax.random.PRNGKey(42), shape=(512, 3), minval=-10, maxval=10)
+    for label in ("first call (with compilation)", "second call (cached)"):
+        start = time.perf_counter()
+        x, converged, iterations = jax.block_until_ready(newton_multistart(system, x0s))
+        print(f"{label}: {time.perf_counter() - start:.3f} s")
+    print(f"{int(converged.sum())} of {len(x0s)} guesses converged, median {int(jnp.median(iterations))} iterations")
+    for r in distinct_roots(x, converged):
+        print(f"root {r}, |f| = {float(jnp.linalg.norm(system(jnp.asarray(r)))):.1e}")
+
+    # Bratu problem with n = 316^2 ~ 10^5 unknowns; the Jacobian has the sparsity of the Laplacian
+    m = 316
+    laplacian = laplacian_2d(m)
+    u0 = np.zeros(m * m)
+    M = LinearOperator(laplacian.shape, matvec=splu(laplacian.tocsc()).solve, dtype=np.float64)   # inverts the linear part
+    for mode, options in (("jfnk", {"M": M}), ("colored", {"sparsity": laplacian})):
+        start = time.perf_counter()
+        u, info = newton_krylov(bratu, u0, tol=1e-8, mode=mode, full_output=True, **options)
+        print(f"Bratu, n = {u.size}, {mode}: {time.perf_counter() - start:.2f} s, {info['iterations']} Newton iterations, "
+              f"{info['linear_iterations']} GMRES iterations, |F| = {info['residuals'][-1]:.1e}, max u = {u.max():.6f}")
@@ -0,0 +1,172 @@
+# ---------------------------------------------------------------------------------------------
+#   Compiled optimizers: Barzilai-Borwein steepest descent, Adam and L-BFGS
+#   Updated: Oct 18, 2026
+#   Reference:
+#       J. Barzilai and J. M. Borwein, Two-point step size gradient methods, IMA J. Numer. Anal. 8, 141 (1988)
+#       D. P. Kingma and J. Ba, Adam: a method for stochastic optimization, arXiv:1412.6980
+#       J. Nocedal and S. J. Wright, Numerical Optimization, 2nd ed. (2006), chap. 7
+#       https://docs.jax.dev/en/latest/_autosummary/jax.value_and_grad.html
+#       https://docs.jax.dev/en/latest/_autosummary/jax.debug.callback.html
+# ---------------------------------------------------------------------------------------------
+from functools import lru_cache, partial
+from typing import Callable
+import jax
+import jax.numpy as jnp
+from jax import lax
+
+"""
+    Every method runs its whole iteration as one lax.while_loop compiled with jax.jit, so a run is a
+    single dispatch instead of several eager JAX calls per iteration. The loss and its gradient come
+    from one value_and_grad pass. The compiled loop is cached by jax for every combination of loss
+    function, method, shapes and static settings (max_itr, callback, stride, history, max_halvings).
+
+    Progress is reported through callback(t, loss, x), called every `stride` iterations from inside
+    the loop with jax.debug.callback (ordered, so the lines come out in iteration order), which does
+    not block the computation like printing a device value would.
+
+    The iteration stops once loss < tol or |grad| < gtol.
+        bb:     x <- x - alpha g with the Barzilai-Borwein step alpha = s.s / s.y (s and y are the
+                last changes of x and g); the first step is alpha = loss / |g|^2, which suits losses
+                whose minimum is 0, such as the sum of squared residuals
+        adam:   Adam with learning rate lr and moment decay rates b1, b2
+        lbfgs:  L-BFGS with the last `history` pairs (s, y) and a backtracking line search
+"""
+
+METHODS = ("bb", "adam", "lbfgs")
+
+def print_progress(t, loss, x):
+    print(f"t = {t}, loss = {loss}")
+
+def _bb(value_and_grad_func, hyper, history, max_halvings):
+    def init(x, value, grad):
+        return x, grad
+
+    def update(t, x, value, grad, state):
+        x_prev, grad_prev = state
+        s, y = x - x_prev, grad - grad_prev
+        sy = jnp.vdot(s, y)
+        alpha = jnp.where((t > 0) & (sy > 0), jnp.vdot(s, s) / sy, value / jnp.vdot(grad, grad))
+        x_new = x - alpha * grad
+        return (x_new, *value_and_grad_func(x_new), (x, grad))
+
+    return init, update
+
+def _adam(value_and_grad_func, hyper, history, max_halvings):
+    def init(x, value, grad):
+        return jnp.zeros_like(x), jnp.zeros_like(x)
+
+    def update(t, x, value, grad, state):
+        m, v = state
+        m = hyper["b1"] * m + (1 - hyper["b1"]) * grad
+        v = hyper["b2"] * v + (1 - hyper["b2"]) * grad ** 2
+        m_hat = m / (1 - hyper["b1"] ** (t + 1))
+        v_hat = v / (1 - hyper["b2"] ** (t + 1))
+        x_new = x - hyper["lr"] * m_hat / (jnp.sqrt(v_hat) + hyper["eps"])
+        return (x_new, *value_and_grad_func(x_new), (m, v))
+
+    return init, update
+
+def _lbfgs(value_and_grad_func, hyper, history, max_halvings):
+    def init(x, value, grad):
+        return jnp.zeros((history,) + x.shape), jnp.zeros((history,) + x.shape), jnp.zeros(history), 0
+
+    def direction(grad, S, Y, rho, head):
+        # two-loop recursion over the stored pairs, newest first; empty slots have rho = 0
+        def first(i, carry):
+            q, alphas = carry
+            j = (head - 1 - i) % history
+            a = rho[j] * jnp.vdot(S[j], q)
+            return q - a * Y[j], alphas.at[j].set(a)
+
+        def second(i, r):
+            j = (head + i) % history
+            return r + S[j] * (alphas[j] - rho[j] * jnp.vdot(Y[j], r))
+
+        q, alphas = lax.fori_loop(0, history, first, (grad, jnp.zeros(history)))
+        newest = (head - 1) % history
+        gamma = jnp.where(rho[newest] > 0, 1 / (rho[newest] * jnp.vdot(Y[newest], Y[newest])), 1.0)
+        return -lax.fori_loop(0, history, second, gamma * q)
+
+    def update(t, x, value, grad, state):
+        S, Y, rho, head = state
+        p = direction(grad, S, Y, rho, head)
+        slope = jnp.vdot(grad, p)
+        p, slope = jnp.where(slope < 0, p, -grad), jnp.where(slope < 0, slope, -jnp.vdot(grad, grad))
+
+        def cond(carry):        # Armijo condition, NaN counts as a failure
+            step, value_new, _, i = carry
+            return ~(value_new <= value + 1e-4 * step * slope) & (i < max_halvings)
+
+        def body(carry):
+            step, _, _, i = carry
+            return (step / 2, *value_and_grad_func(x + step / 2 * p), i + 1)
+
+        step, value_new, grad_new, _ = lax.while_loop(cond, body, (1.0, *value_and_grad_func(x + p), 0))
+        s, y = step * p, grad_new - grad
+        sy = jnp.vdot(s, y)
+        accept = sy > 1e-10         # keep the inverse Hessian approximation positive definite
+        S = jnp.where(accept, S.at[head].set(s), S)
+        Y = jnp.where(accept, Y.at[head].set(y), Y)
+        rho = jnp.where(accept, rho.at[head].set(1 / sy), rho)
+        head = jnp.where(accept, (head + 1) % history, head)
+        return x + s, value_new, grad_new, (S, Y, rho, head)
+
+    return init, update
+
+_BACKENDS = {"bb": _bb, "adam": _adam, "lbfgs": _lbfgs}
+
+@lru_cache(maxsize=None)
+def _value_and_grad(loss_func: Callable, grad_func: Callable=None) -> Callable:
+    # one function object per (loss_func, grad_func), so that the compiled loop is found in the cache
+    if grad_func is None:
+        return jax.value_and_grad(loss_func)
+    return lambda x: (loss_func(x), grad_func(x))   # an explicit override: two separate traced passes
+
+@partial(jax.jit, static_argnames=("value_and_grad_func", "method", "max_itr", "callback", "stride", "history",
+                                   "max_halvings"))
+def _run(value_and_grad_func, x0, tol, gtol, hyper, method, max_itr, callback, stride, history, max_halvings):
+    init, update = _BACKENDS[method](value_and_grad_func, hyper, history, max_halvings)
+    value, grad = value_and_grad_func(x0)
+
+    def cond(carry):
+        t, _, value, grad, _ = carry
+        return (t < max_itr) & (value >= tol) & (jnp.linalg.norm(grad) >= gtol)
+
+    def body(carry):
+        t, x, value, grad, state = carry
+        x, value, grad, state = update(t, x, value, grad, state)
+        if callback is not None:
+            lax.cond(t % stride == 0, lambda: jax.debug.callback(callback, t, value, x, ordered=True), lambda: None)
+        return t + 1, x, value, grad, state
+
+    t, x, value, grad, _ = lax.while_loop(cond, body, (0, x0, value, grad, init(x0, value, grad)))
+    return x, value, grad, t
+
+def minimize(loss_func: Callable, x0: jnp.ndarray, method: str="lbfgs", tol: float=1e-6, gtol: float=0.0,
+             max_itr: int=1000, callback: Callable=None, stride: int=100, grad_func: Callable=None,
+             lr: float=1e-2, b1: float=0.9, b2: float=0.999, eps: float=1e-8, history: int=10,
+             max_halvings: int=30) -> tuple:
+    """
+    :param loss_func: the loss function of a 1-D array (must be hashable, e.g. a module-level function)
+    :param x0: the initial guess
+    :param method: "bb", "adam" or "lbfgs"
+    :param tol: stop once the loss drops below tol
+    :param gtol: stop once the norm of the gradient drops below gtol
+    :param max_itr: maximum number of iterations
+    :param callback: called as callback(t, loss, x) every `stride` iterations, None for no output
+    :param stride: the number of iterations between two calls of callback
+    :param grad_func: an explicit gradient of loss_func, overriding the single jax.value_and_grad pass;
+                      the loss and the gradient are then traced as two separate passes
+    :param lr, b1, b2, eps: the Adam hyperparameters
+    :param history: the number of (s, y) pairs stored by L-BFGS
+    :param max_halvings: the maximum number of step halvings in the L-BFGS line search
+    :return: the final x and a dict with the loss, the gradient norm, the iteration count and
+             whether the stopping criterion was met
+    """
+    assert method in METHODS
+    hyper = {"lr": lr, "b1": b1, "b2": b2, "eps": eps}
+    x, value, grad, t = _run(_value_and_grad(loss_func, grad_func), jnp.asarray(x0, dtype=jnp.result_type(float)), tol, gtol, hyper,
+                             method, max_itr, callback, stride, history, max_halvings)
+    value, grad_norm = float(value), float(jnp.linalg.norm(grad))
+    return x, {"loss": value, "grad_norm": grad_norm, "iterations": int(t),
+               "converged": value < tol or grad_norm < gtol}
@@ -0,0 +1,178 @@
+# ------------------------------------------------------------------------------------------------------------
+#   Barycentric Lagrange interpolation and adaptive Chebyshev interpolants
+#   Updated: Oct 18, 2026
+#   Reference:
+#       J.-P. Berrut and L. N. Trefethen, Barycentric Lagrange interpolation, SIAM Rev. 46, 501 (2004)
+#       L. N. Trefethen, Approximation Theory and Approximation Practice (2013), chap. 5 & 8
+# ------------------------------------------------------------------------------------------------------------
+import time
+import numpy as np
+from scipy.fft import dct
+from scipy.interpolate import lagrange
+
+"""
+    The interpolating polynomial through (x_j, y_j) can be written as
+        p(x) = sum_j w_j y_j / (x - x_j)  /  sum_j w_j / (x - x_j),     w_j = 1 / prod_{k != j} (x_j - x_k)
+    Once the weights are known (O(n^2), or O(n) in closed form for Chebyshev points), every evaluation
+    costs O(n) and is numerically stable; adding a node updates the weights in O(n). Only the ratios
+    of the weights matter, so they are rescaled freely to avoid overflow.
+
+    On the Chebyshev points x_j = cos(j pi / n), j = 0, ..., n, the weights are (-1)^j (halved at both
+    ends), and the interpolant converges geometrically for analytic functions, e.g. the Runge function,
+    where equally spaced points fail.
+"""
+
+_CHUNK = 2**22      # number of (point, node) pairs handled at once by the evaluation
+
+def chebyshev_points(n: int, a: float=-1.0, b: float=1.0) -> np.ndarray:
+    """
+    :return: the n + 1 Chebyshev points of the second kind mapped to [a, b] (in decreasing order)
+    """
+    return (a + b) / 2 + (b - a) / 2 * np.cos(np.pi * np.arange(n + 1) / n)
+
+class BarycentricInterpolator:
+    """
+    Polynomial interpolation in barycentric form.
+    """
+    def __init__(self, x_nodes: np.ndarray, y_nodes: np.ndarray, weights: np.ndarray=None):
+        """
+        :param x_nodes: distinct interpolation points, shape (n,)
+        :param y_nodes: the values at x_nodes, shape (n,) or (n, ...) for vector-valued data
+        :param weights: the barycentric weights, computed from x_nodes if None
+        """
+        self.x = np.asarray(x_nodes, dtype=np.float64).ravel()
+        self.y = np.asarray(y_nodes, dtype=np.float64)
+        assert self.y.shape[0] == self.x.size
+        self.w = self._weights(self.x) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    @staticmethod
+    def _weights(x: np.ndarray) -> np.ndarray:
+        # sum of log |x_j - x_k| row by row, so that products of 1000+ factors cannot overflow
+        n = x.size
+        log_w, sign = np.empty(n), np.ones(n)
+        rows = max(_CHUNK // max(n, 1), 1)
+        for start in range(0, n, rows):
+            diff = x[start:start + rows, None] - x[None, :]
+            diff[np.arange(diff.shape[0]), np.arange(start, start + diff.shape[0])] = 1
+            log_w[start:start + rows] = -np.log(np.abs(diff)).sum(axis=1)
+            sign[start:start + rows] = np.prod(np.sign(diff), axis=1)
+        return sign * np.exp(log_w - log_w.max())
+
+    def __len__(self):
+        return self.x.size
+
+    def add_nodes(self, x_new, y_new):
+        """
+        Add interpolation points, updating the weights in O(n) per point.
+
+        :param x_new: the new points, distinct from the existing ones
+        :param y_new: the values at x_new
+        """
+        x_new = np.atleast_1d(np.asarray(x_new, dtype=np.float64))
+        y_new = np.asarray(y_new, dtype=np.float64).reshape((x_new.size,) + self.y.shape[1:])
+        for xi in x_new:
+            diff = self.x - xi
+            # the stored weights carry an unknown common factor, so the new one is set through its
+            # ratio to the updated weight of node 0:
+            #   w_new / w_0 = (x_0 - xi) prod_{j > 0} (x_0 - x_j) / prod_j (xi - x_j)
+            others = self.x[0] - self.x[1:]
+            log_ratio = np.log(np.abs(diff)).sum() - np.log(np.abs(others)).sum() - np.log(np.abs(diff[0]))
+            sign = np.prod(np.sign(-diff)) * np.prod(np.sign(others)) * np.sign(diff[0])
+            self.w = self.w / diff
+            self.w = np.append(self.w, self.w[0] * sign * np.exp(-log_ratio))
+            self.w /= np.abs(self.w).max()
+            self.x = np.append(self.x, xi)
+        self.y = np.concatenate([self.y, y_new])
+
+    def __call__(self, x) -> np.ndarray:
+        """
+        :param x: the evaluation points, any shape
+        :return: the interpolant at x, shape x.shape + y.shape[1:]
+        """
+        x = np.asarray(x, dtype=np.float64)
+        points = x.ravel()
+        y = self.y.reshape(self.x.size, -1)
+        out = np.empty((points.size, y.shape[1]))
+        rows = max(_CHUNK // self.x.size, 1)
+        for start in range(0, points.size, rows):
+            p = points[start:start + rows]
+            diff = p[:, None] - self.x[None, :]
+            exact = diff == 0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                c = self.w / diff
+                values = (c @ y) / c.sum(axis=1)[:, None]
+            hit, node = np.nonzero(exact)           # the formula is 0/0 at the nodes themselves
+            values[hit] = y[node]
+            out[start:start + rows] = values
+        return out.reshape(x.shape + self.y.shape[1:])
+
+    @classmethod
+    def chebyshev(cls, f, a: float=-1.0, b: float=1.0, n: int=None, tol: float=1e-14, max_n: int=2**16):
+        """
+        Interpolate f at Chebyshev points of [a, b]. If n is None, the degree is chosen adaptively:
+        the grid is doubled (reusing the previous values, as the grids are nested) until the Chebyshev
+        coefficients decay below tol relative to the largest one, and the tail is then chopped.
+
+        :param f: the function, vectorized over arrays
+        :param a: the left end of the interval
+        :param b: the right end of the interval
+        :param n: the polynomial degree (n + 1 points), or None for adaptive selection
+        :param tol: the relative size of the discarded Chebyshev coefficients
+        :param max_n: the largest degree tried
+        :return: the interpolant
+        """
+        if n is not None:
+            x = chebyshev_points(n, a, b)
+            return cls(x, f(x), cls._chebyshev_weights(n))
+
+        n = 16
+        values = f(chebyshev_points(n, a, b))
+        while True:
+            coeffs = dct(values, type=1) / n
+            coeffs[[0, -1]] /= 2
+            scale = np.abs(coeffs).max()
+            significant = np.flatnonzero(np.abs(coeffs) > tol * scale) if scale > 0 else np.array([0])
+            degree = int(significant[-1]) if significant.size else 0
+            if degree < n - 2 or 2 * n > max_n:      # the last coefficients are negligible: resolved
+                break
+            odd = chebyshev_points(2 * n, a, b)[1::2]
+            refined = np.empty(2 * n + 1)
+            refined[::2], refined[1::2] = values, f(odd)
+            values, n = refined, 2 * n
+
+        degree = max(degree, 1)
+        chopped = coeffs[:degree + 1].copy()
+        chopped[[0, -1]] *= 2
+        return cls(chebyshev_points(degree, a, b), dct(chopped, type=1) / 2, cls._chebyshev_weights(degree))
+
+    @staticmethod
+    def _chebyshev_weights(n: int) -> np.ndarray:
+        w = (-1.0) ** np.arange(n + 1)
+        w[[0, -1]] /= 2
+        return w
+
+if __name__ == "__main__":
+    runge_function = lambda x: 1 / (1 + x * x)
+    x_vals = np.linspace(-5, 5, 10**6)
+
+    interpolant = BarycentricInterpolator.chebyshev(runge_function, -5, 5)
+    start = time.perf_counter()
+    y_vals = interpolant(x_vals)
+    print(f"adaptive Chebyshev interpolant of degree {len(interpolant) - 1}: {x_vals.size} points in "
+          f"{time.perf_counter() - start:.2f} s, max error = {np.abs(y_vals - runge_function(x_vals)).max():.1e}")
+
+    for n in (20, 1000):
+        x_nodes = chebyshev_points(n - 1, -5, 5)
+        barycentric = BarycentricInterpolator(x_nodes, runge_function(x_nodes))
+        x_test = x_vals[::1000]
+        with np.errstate(all="ignore"):     # the monomial coefficients overflow for n = 1000
+            poly = lagrange(x_nodes, runge_function(x_nodes))
+            poly_error = np.abs(poly(x_test) - runge_function(x_test)).max()
+        print(f"{n} Chebyshev points, max error: barycentric {np.abs(barycentric(x_test) - runge_function(x_test)).max():.1e}, "
+              f"scipy lagrange {poly_error:.1e}")
+
+    # adding nodes one at a time gives the same interpolant
+    x_nodes = chebyshev_points(40, -5, 5)
+    incremental = BarycentricInterpolator(x_nodes[:1], runge_function(x_nodes[:1]))
+    incremental.add_nodes(x_nodes[1:], runge_function(x_nodes[1:]))
+    print(f"incremental vs direct: {np.abs(incremental(x_test) - BarycentricInterpolator(x_nodes, runge_function(x_nodes))(x_test)).max():.1e}")
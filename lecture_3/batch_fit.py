@@ -0,0 +1,184 @@
+# ------------------------------------------------------------------------------------------------------------
+#   Batched least-squares fits of one model to many datasets
+#   Updated: Oct 18, 2026
+#   Reference:
+#       https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.curve_fit.html
+#       A. Bjorck, Numerical Methods for Least Squares Problems (1996), chap. 2 & 9
+# ------------------------------------------------------------------------------------------------------------
+import inspect
+import time
+from functools import lru_cache
+import jax
+import jax.numpy as jnp
+import numpy as np
+from scipy.linalg import qr, solve_triangular
+from scipy.optimize import curve_fit
+
+"""
+    batch_curve_fit(f, x, Y) fits f(x, *p) to every row of Y and returns the stacked parameters and
+    covariances, with the conventions of curve_fit (absolute_sigma=False): cov = s^2 (J^T J)^{-1} with
+    s^2 = sum of squared residuals / (n - k).
+
+    Models such as a x + b or polynomials are linear in their parameters: f(x, p) = c + A p, with
+    c = f(x, 0) and the columns of the design matrix A = f(x, e_j) - c. Then the QR factorization of A
+    is computed once and all datasets are solved together by one triangular solve with many right-hand
+    sides, instead of Levenberg-Marquardt iterations per dataset as in curve_fit, and
+    (J^T J)^{-1} = R^{-1} R^{-T} is shared by all of them.
+
+    Other models fall back to Gauss-Newton iterations with Jacobians from jax.jacfwd, vmapped over the
+    datasets and compiled with jax.jit; f must then be written with jax.numpy.
+
+    sigma may also differ between datasets, shape (m, n), e.g. to weight the points of bootstrap
+    resamples by their multiplicity (an infinite sigma drops a point). The linear path then still
+    factorizes A = Q R once and solves, per dataset, the k x k weighted normal equations in the
+    orthonormal basis Q, whose condition number is not squared by the weights.
+"""
+
+def num_params(f, p0=None) -> int:
+    """
+    :return: the number of parameters of the model f(x, *params), from p0 or from the signature of f
+    """
+    if p0 is not None:
+        return np.shape(p0)[-1]
+    return len(inspect.signature(f).parameters) - 1
+
+def is_linear_in_params(f, x: np.ndarray, k: int, rtol: float=1e-9) -> bool:
+    """
+    :return: whether f(x, p) = f(x, 0) + A p, checked at two random parameter vectors
+    """
+    c = np.asarray(f(x, *np.zeros(k)), dtype=np.float64)
+    A = np.stack([np.asarray(f(x, *np.eye(k)[j]), dtype=np.float64) - c for j in range(k)], axis=-1)
+    for p in np.random.default_rng(0).normal(size=(2, k)):
+        value = np.asarray(f(x, *p), dtype=np.float64)
+        if not np.allclose(value, c + A @ p, rtol=rtol, atol=rtol * np.abs(value).max()):
+            return False
+    return True
+
+def _linear_fit(f, x: np.ndarray, Y: np.ndarray, k: int, scale: np.ndarray) -> tuple:
+    # scale = 1 / sigma, shape (n,) or (m, n)
+    c = np.asarray(f(x, *np.zeros(k)), dtype=np.float64)
+    A = np.stack([np.asarray(f(x, *np.eye(k)[j]), dtype=np.float64) - c for j in range(k)], axis=-1)
+    if scale.ndim == 1:
+        A, B = A * scale[:, None], ((Y - c) * scale).T          # B: one column per dataset
+        Q, R = qr(A, mode="economic")
+        params = solve_triangular(R, Q.T @ B).T
+        residuals = B.T - params @ A.T
+        R_inv = solve_triangular(R, np.eye(k))
+        return params, R_inv @ R_inv.T, np.sum(residuals**2, axis=1)
+
+    # per-dataset weights W: with A = Q R and p = R^{-1} z, solve (Q^T W Q) z = Q^T W (y - c)
+    Q, R = qr(A, mode="economic")
+    W, B = scale**2, Y - c
+    G = (W @ (Q[:, :, None] * Q[:, None, :]).reshape(-1, k * k)).reshape(-1, k, k)
+    z = np.linalg.solve(G, ((W * B) @ Q)[:, :, None])[:, :, 0]
+    params = solve_triangular(R, z.T).T
+    R_inv = solve_triangular(R, np.eye(k))
+    base = R_inv @ np.linalg.inv(G) @ R_inv.T
+    return params, base, np.sum(W * (B - z @ Q.T) ** 2, axis=1)
+
+@lru_cache(maxsize=None)
+def _gauss_newton(f, max_itr: int):
+    def solve_one(p, x, y, scale, tol):
+        residual = lambda p: (f(x, *p) - y) * scale
+        jacobian = jax.jacfwd(residual)
+
+        def cond(state):
+            _, k, done, _ = state
+            return ~done & (k < max_itr)
+
+        def body(state):
+            p, k, _, _ = state
+            r, J = residual(p), jacobian(p)
+            Q, R = jnp.linalg.qr(J)
+            step = jax.scipy.linalg.solve_triangular(R, -Q.T @ r)
+            rss = jnp.sum(r**2)
+
+            def halve(carry):       # damp the step until the sum of squares decreases
+                t, _ = carry
+                return t / 2, jnp.sum(residual(p + t / 2 * step) ** 2)
+
+            t, _ = jax.lax.while_loop(lambda c: (c[1] > rss) & (c[0] > 1e-6), halve,
+                                      (1.0, jnp.sum(residual(p + step) ** 2)))
+            done = jnp.linalg.norm(t * step) <= tol * (jnp.linalg.norm(p) + tol)
+            return p + t * step, k + 1, done, rss
+
+        p, _, converged, _ = jax.lax.while_loop(cond, body, (p, 0, False, 0.0))
+        r, J = residual(p), jacobian(p)
+        R = jnp.linalg.qr(J, mode="r")
+        R_inv = jax.scipy.linalg.solve_triangular(R, jnp.eye(p.size))
+        return p, R_inv @ R_inv.T, jnp.sum(r**2), converged
+
+    return jax.jit(jax.vmap(solve_one, in_axes=(0, None, 0, 0, None)))
+
+def batch_curve_fit(f, x: np.ndarray, Y: np.ndarray, p0: np.ndarray=None, sigma: np.ndarray=None,
+                    linear: bool=None, tol: float=1e-10, max_itr: int=100, full_output: bool=False):
+    """
+    :param f: the model f(x, *params)
+    :param x: the independent variable, shared by all datasets, shape (n,)
+    :param Y: the data, shape (m, n) for m datasets (or (n,) for one)
+    :param p0: the initial parameters for nonlinear models, shape (k,) or (m, k); ones if None
+    :param sigma: the uncertainties of the data points, shape (n,) shared by all datasets, or (m, n)
+    :param linear: whether f is linear in its parameters; detected if None
+    :param tol: the relative tolerance on the Gauss-Newton step
+    :param max_itr: the maximum number of Gauss-Newton iterations
+    :param full_output: also return a dict with the residual sums of squares (and, for nonlinear
+                        models, the per-dataset convergence flags)
+    :return: the optimal parameters, shape (m, k), and their covariances, shape (m, k, k)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64)
+    single = Y.ndim == 1
+    Y = np.atleast_2d(Y)
+    m, n = Y.shape
+    k = num_params(f, p0)
+    sigma = np.ones(n) if sigma is None else np.asarray(sigma, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        scale = 1 / (sigma if sigma.ndim == 2 else np.broadcast_to(sigma, (n,)))
+    linear = is_linear_in_params(f, x, k) if linear is None else linear
+
+    info = {"linear": linear}
+    if linear:
+        params, base, rss = _linear_fit(f, x, Y, k, scale)
+        covariances = base * (rss / max(n - k, 1))[:, None, None]
+    else:
+        p0 = np.ones(k) if p0 is None else np.asarray(p0, dtype=np.float64)
+        with jax.enable_x64(True):
+            params, base, rss, converged = _gauss_newton(f, max_itr)(
+                jnp.asarray(np.broadcast_to(p0, (m, k))), jnp.asarray(x), jnp.asarray(Y),
+                jnp.asarray(np.broadcast_to(scale, (m, n))), tol)
+            params, base, rss = np.asarray(params), np.asarray(base), np.asarray(rss)
+            info["converged"] = np.asarray(converged)
+        covariances = base * (rss / max(n - k, 1))[:, None, None]
+    info["rss"] = rss
+
+    if single:
+        params, covariances = params[0], covariances[0]
+    return (params, covariances, info) if full_output else (params, covariances)
+
+if __name__ == "__main__":
+    from l3_q5 import linear_func, x, y
+
+    rng = np.random.default_rng(42)
+    m = 20000
+    Y = y + rng.normal(scale=0.05, size=(m, y.size))      # many noisy replicas of the l3_q5 data
+
+    start = time.perf_counter()
+    params, covariances = batch_curve_fit(linear_func, x, Y)
+    batch_time = time.perf_counter() - start
+    start = time.perf_counter()
+    reference = [curve_fit(linear_func, x, Yi) for Yi in Y[:200]]
+    loop_time = (time.perf_counter() - start) * m / 200
+    print(f"{m} linear fits: batched {batch_time:.3f} s, curve_fit loop {loop_time:.1f} s (extrapolated)")
+    print(f"max difference to curve_fit: parameters {max(np.abs(p - params[i]).max() for i, (p, _) in enumerate(reference)):.1e}, "
+          f"covariances {max(np.abs(c - covariances[i]).max() for i, (_, c) in enumerate(reference)):.1e}")
+
+    decay = lambda x, a, b, c: a * jnp.exp(-b * x) + c   # not linear in b
+    t = np.linspace(0, 4, 50)
+    Y = 2.5 * np.exp(-1.3 * t) + 0.5 + rng.normal(scale=0.02, size=(m, t.size))
+    batch_curve_fit(decay, t, Y, p0=[1.0, 1.0, 0.0])      # compilation
+    start = time.perf_counter()
+    params, covariances, info = batch_curve_fit(decay, t, Y, p0=[1.0, 1.0, 0.0], full_output=True)
+    print(f"{m} nonlinear fits (Gauss-Newton): {time.perf_counter() - start:.3f} s, {info['converged'].sum()} converged")
+    p, c = curve_fit(lambda x, a, b, c: a * np.exp(-b * x) + c, t, Y[0], p0=[1.0, 1.0, 0.0])
+    print(f"first dataset: {params[0]} +- {np.sqrt(np.diag(covariances[0]))}")
+    print(f"curve_fit:     {p} +- {np.sqrt(np.diag(c))}")
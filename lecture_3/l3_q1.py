@@ -1,19 +1,70 @@
 # ---------------------------------------------------------------------------------------------
 #   l3-q1, Three-point parabolic interpolation
 #   Author: Yi-Ming Ding
-#   Updated: Mar 5, 2025
+#   Updated: Oct 18, 2026
 # ---------------------------------------------------------------------------------------------
+import time
 import numpy as np
 
 x_node = np.array([0, 1, 2])
 y_node = np.array([8, -7.5, -18])
 
+"""
+    Inverse interpolation: swapping the roles of x and y, the interpolating polynomial x(y) through
+    the nodes (y_i, x_i) gives the x where the tabulated function reaches a value y; x(0) is an
+    estimate of its root. InverseInterpolator does this for large tables and arrays of targets: the
+    order + 1 nodes nearest to every target are located with searchsorted (y must be monotonic), and
+    all the local polynomials are evaluated at once with Neville's scheme
+        P_{i..i+l}(y) = ((y - y_{i+l}) P_{i..i+l-1}(y) + (y_i - y) P_{i+1..i+l}(y)) / (y_i - y_{i+l})
+"""
+
+class InverseInterpolator:
+    """
+    Piecewise inverse Lagrange interpolation of configurable order.
+    """
+    def __init__(self, x_nodes: np.ndarray, y_nodes: np.ndarray, order: int=2):
+        """
+        :param x_nodes: the abscissae of the table
+        :param y_nodes: the tabulated values, strictly monotonic (increasing or decreasing)
+        :param order: the degree of the local polynomials (order + 1 nodes each, at most len(x_nodes) - 1)
+        """
+        x_nodes = np.asarray(x_nodes, dtype=np.float64)
+        y_nodes = np.asarray(y_nodes, dtype=np.float64)
+        assert x_nodes.shape == y_nodes.shape and 1 <= order < x_nodes.size
+        sort = np.argsort(y_nodes)
+        self.x, self.y, self.order = x_nodes[sort], y_nodes[sort], order
+        assert np.all(np.diff(self.y) > 0), "y_nodes must be strictly monotonic"
+
+    def __call__(self, y) -> np.ndarray:
+        """
+        :param y: the target values, any shape (targets outside the table are extrapolated)
+        :return: the x with f(x) = y, same shape as y
+        """
+        y = np.asarray(y, dtype=np.float64)
+        targets = y.ravel()[:, None]
+        k = self.order + 1
+        start = np.clip(np.searchsorted(self.y, targets[:, 0]) - k // 2, 0, self.y.size - k)
+        stencil = start[:, None] + np.arange(k)
+        ys, p = self.y[stencil], self.x[stencil]
+        for level in range(1, k):
+            p = ((targets - ys[:, level:]) * p[:, :-1] + (ys[:, :-level] - targets) * p[:, 1:]) \
+                / (ys[:, :-level] - ys[:, level:])
+        return p[:, 0].reshape(y.shape)[()]
+
 def func_inv(y: float) -> float:
-    l0 = x_node[0] * (y - y_node[1]) * (y - y_node[2]) / ((y_node[0] - y_node[1]) * (y_node[0] - y_node[2]))
-    l1 = x_node[1] * (y - y_node[0]) * (y - y_node[2]) / ((y_node[1] - y_node[0]) * (y_node[1] - y_node[2]))
-    l2 = x_node[2] * (y - y_node[0]) * (y - y_node[1]) / ((y_node[2] - y_node[0]) * (y_node[2] - y_node[1]))
-    return float(l0 + l1 + l2)
+    return float(InverseInterpolator(x_node, y_node, order=2)(y))
 
 if __name__ == "__main__":
     x = func_inv(0)
-    print(f"x = {x}")
\ No newline at end of file
+    print(f"x = {x}")
+
+    # a table of 10^6 values of f(x) = x - cos(x), inverted at 10^6 targets in one call
+    x_table = np.linspace(0, 2, 10**6)
+    f = lambda x: x - np.cos(x)
+    targets = np.random.default_rng(42).uniform(f(0.01), f(1.99), 10**6)
+    for order in (1, 2, 3, 5):
+        inverse = InverseInterpolator(x_table, f(x_table), order=order)
+        start = time.perf_counter()
+        x = inverse(targets)
+        print(f"order {order}: {time.perf_counter() - start:.2f} s, max |f(x) - y| = {np.abs(f(x) - targets).max():.1e}")
+    print(f"root of x - cos(x): {inverse(0.0):.15f}")
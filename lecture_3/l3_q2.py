@@ -6,7 +6,7 @@
 # ------------------------------------------------------------------------------------------------------------
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.interpolate import lagrange
+from barycentric import BarycentricInterpolator
 
 x_nodes = np.random.uniform(0, 2 * np.pi, 9)     # randomly generate 9 points
 y_nodes = np.sin(x_nodes)
@@ -14,8 +14,8 @@ y_nodes = np.sin(x_nodes)
 if __name__ == "__main__":
     print(f"x_nodes = {x_nodes}")
     print(f"y_nodes = {y_nodes}")
-    poly = lagrange(x_nodes, y_nodes)
-    print("Lagrange Polynomial:", poly)
+    poly = BarycentricInterpolator(x_nodes, y_nodes)    # the Lagrange polynomial in barycentric form
+    print("Barycentric weights:", poly.w)
 
     x_vals = np.linspace(0, 2 * np.pi, 21)
     y_vals = poly(x_vals)
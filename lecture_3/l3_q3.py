@@ -6,7 +6,7 @@
 # ------------------------------------------------------------------------------------------------------------
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.interpolate import lagrange
+from barycentric import BarycentricInterpolator
 
 runge_function = lambda x : 1 / (1 + x * x)
 n = 20
@@ -16,20 +16,25 @@ y_nodes = runge_function(x_nodes)
 """
     Runge phenomenon:
         equally spaced interpolation points make the interpolation unstable
+    Chebyshev points cluster near the ends of the interval and fix it: the adaptive Chebyshev
+    interpolant picks the degree at which the function is resolved to machine precision.
 """
 
 if __name__ == "__main__":
     print(f"x_nodes = {x_nodes}")
     print(f"y_nodes = {y_nodes}")
-    poly = lagrange(x_nodes, y_nodes)
-    print("Lagrange Polynomial:", poly)
+    poly = BarycentricInterpolator(x_nodes, y_nodes)
+    chebyshev = BarycentricInterpolator.chebyshev(runge_function, -5, 5)
 
     x_vals = np.linspace(-5, 5, 100)
     y_vals = poly(x_vals)
+    print(f"Chebyshev interpolant of degree {len(chebyshev) - 1}, "
+          f"max error = {np.abs(chebyshev(x_vals) - runge_function(x_vals)).max():.1e}")
 
     plt.title("Lagrange Interpolation of $y = 1/(1+x^2)$")
     plt.plot(x_vals, runge_function(x_vals), label="Original function", linestyle="-")
     plt.plot(x_vals, y_vals, label="Lagrange Interpolation", linestyle=":")
+    plt.plot(x_vals, chebyshev(x_vals), label="Chebyshev Interpolation", linestyle="--")
     plt.scatter(x_nodes, y_nodes, color='red', label="Data Points")
     plt.axhline(0, color='gray', linestyle='--')
     plt.legend()
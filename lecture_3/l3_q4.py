@@ -6,7 +6,7 @@
 # ------------------------------------------------------------------------------------------------------------
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.interpolate import CubicSpline
+from spline_service import ChunkedCubicSpline
 
 runge_function = lambda x : 1 / (1 + x * x)
 
@@ -16,10 +16,10 @@ y_nodes = runge_function(x_nodes)
 
 if __name__ == "__main__":
     plt.plot(x_nodes, y_nodes, label="Lagrange Interpolation")
-    cs = CubicSpline(x_nodes, y_nodes)
+    cs = ChunkedCubicSpline(x_nodes, y_nodes)     # same spline as scipy's CubicSpline, see spline_service.py
 
     x_vals = np.linspace(-1, 1, 100)
-    y_vals = cs(x_vals)
+    y_vals = cs(x_vals, assume_sorted=True)
 
     plt.title("Cubic Spline Interpolation of $y = 1/(1+x^2)$")
     plt.plot(x_vals, runge_function(x_vals)  , label="Original function", linestyle="-")
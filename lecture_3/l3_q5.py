@@ -7,6 +7,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
+from batch_fit import batch_curve_fit
+from resampling import bootstrap_fit
 
 def linear_func(x, a, b):
     return a * x + b
@@ -22,6 +24,14 @@ if __name__ == "__main__":
     print(f"a = {a:.2f} ± {errors[0]:.2f}")
     print(f"b = {b:.2f} ± {errors[1]:.2f}")
 
+    # the same line from one QR factorization (see batch_fit.py)
+    params_batch, covariance_batch = batch_curve_fit(linear_func, x, y)
+    print(f"Batched linear least squares: {np.round(params_batch, 4)} ± {np.round(np.sqrt(np.diag(covariance_batch)), 4)}")
+
+    # bootstrap errors of a and b, without assuming Gaussian residuals (see resampling.py)
+    _, intervals, info = bootstrap_fit(linear_func, x, y, rng=42)
+    print(f"Bootstrap errors: {np.round(info['errors'], 4)}, 95% intervals: {np.round(intervals, 4).tolist()}")
+
     plt.title("Linear Fit to Data")
     plt.scatter(x, y, label="Data points", color='blue')
     plt.plot(x, linear_func(x, *params), label=f"Fitted line: y = {a:.2f}x + {b:.2f}", color='red')
@@ -7,6 +7,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
+from batch_fit import batch_curve_fit
+from resampling import bootstrap_fit
 
 def poly5(x, a5, a4, a3, a2, a1, a0):
     return a5 * x**5 + a4 * x**4 + a3 * x**3 + a2 * x**2 + a1 * x + a0
@@ -27,6 +29,14 @@ if __name__ == "__main__":
     print(f"a1 = {a1:.4f} ± {errors[4]:.4f}")
     print(f"a0 = {a0:.4f} ± {errors[5]:.4f}")
 
+    # the six coefficients of poly5 from one QR factorization (see batch_fit.py)
+    params_batch, covariance_batch = batch_curve_fit(poly5, x, y)
+    print(f"Batched linear least squares: {np.round(params_batch, 4)} ± {np.round(np.sqrt(np.diag(covariance_batch)), 4)}")
+
+    # bootstrap errors of a5, ..., a0 (see resampling.py)
+    _, intervals, info = bootstrap_fit(poly5, x, y, rng=42)
+    print(f"Bootstrap errors: {np.round(info['errors'], 4)}, 95% intervals: {np.round(intervals, 4).tolist()}")
+
     plt.title("5th order polynomial fit")
     plt.plot(x, y, label="exp(x)", linestyle='-', linewidth=4)
     plt.plot(x, poly5(x, *params), label=f"5th order polynomial fit", linestyle=':', linewidth=4)
@@ -0,0 +1,149 @@
+# ------------------------------------------------------------------------------------------------------------
+#   Online linear regression from running sufficient statistics
+#   Updated: Oct 18, 2026
+#   Reference:
+#       B. P. Welford, Note on a method for calculating corrected sums of squares and products,
+#           Technometrics 4, 419 (1962)
+#       T. F. Chan, G. H. Golub and R. J. LeVeque, Algorithms for computing the sample variance,
+#           Am. Stat. 37, 242 (1983)
+# ------------------------------------------------------------------------------------------------------------
+import time
+import numpy as np
+from scipy.optimize import curve_fit
+
+"""
+    The least-squares line y = a x + b depends on the data only through
+        n,  the means x_bar, y_bar,  and the centered sums S_xx = sum (x - x_bar)^2,
+        S_xy = sum (x - x_bar)(y - y_bar),  S_yy = sum (y - y_bar)^2:
+        a = S_xy / S_xx,  b = y_bar - a x_bar,  RSS = S_yy - a S_xy
+    and, with s^2 = RSS / (n - 2) as in curve_fit,
+        var(a) = s^2 / S_xx,  var(b) = s^2 (1 / n + x_bar^2 / S_xx),  cov(a, b) = -x_bar s^2 / S_xx.
+
+    Accumulating the raw sums of x^2 and x y instead cancels catastrophically when |x_bar| is large
+    compared to the spread of x. The centered sums are updated as in Welford's algorithm; two
+    accumulators A and B (a chunk of new points, or the work of another process) are combined by
+        delta = mean_B - mean_A,  S_AB = S_A + S_B + n_A n_B / (n_A + n_B) delta_x delta_y,
+    so the history itself is never stored and every query costs O(1).
+"""
+
+class OnlineLinearRegression:
+    """
+    Running fit of y = a x + b.
+    """
+    def __init__(self):
+        self.n = 0
+        self.mean_x = self.mean_y = 0.0
+        self.s_xx = self.s_xy = self.s_yy = 0.0
+
+    def __len__(self):
+        return self.n
+
+    def _combine(self, n, mean_x, mean_y, s_xx, s_xy, s_yy):
+        total = self.n + n
+        dx, dy = mean_x - self.mean_x, mean_y - self.mean_y
+        factor = self.n * n / total
+        self.s_xx += s_xx + factor * dx * dx
+        self.s_xy += s_xy + factor * dx * dy
+        self.s_yy += s_yy + factor * dy * dy
+        self.mean_x += dx * n / total
+        self.mean_y += dy * n / total
+        self.n = total
+
+    def update(self, x, y):
+        """
+        Add one point or a chunk of points.
+
+        :param x: the independent variable, a scalar or an array
+        :param y: the measurements, same shape as x
+        :return: self
+        """
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        assert x.shape == y.shape
+        if x.size == 1:         # Welford's update
+            self.n += 1
+            dx, dy = x[0] - self.mean_x, y[0] - self.mean_y
+            self.mean_x += dx / self.n
+            self.mean_y += dy / self.n
+            self.s_xx += dx * (x[0] - self.mean_x)
+            self.s_xy += dx * (y[0] - self.mean_y)
+            self.s_yy += dy * (y[0] - self.mean_y)
+        elif x.size > 1:        # the chunk's centered sums, then the pairwise combination
+            mean_x, mean_y = x.mean(), y.mean()
+            cx, cy = x - mean_x, y - mean_y
+            self._combine(x.size, mean_x, mean_y, cx @ cx, cx @ cy, cy @ cy)
+        return self
+
+    def merge(self, other: "OnlineLinearRegression"):
+        """
+        Add the points accumulated by another instance, e.g. built by a parallel worker.
+
+        :return: self
+        """
+        if other.n:
+            self._combine(other.n, other.mean_x, other.mean_y, other.s_xx, other.s_xy, other.s_yy)
+        return self
+
+    @property
+    def params(self) -> np.ndarray:
+        """
+        :return: the current (a, b)
+        """
+        if self.n < 2 or self.s_xx == 0:
+            raise ValueError("At least two distinct x are needed for a linear fit")
+        a = self.s_xy / self.s_xx
+        return np.array([a, self.mean_y - a * self.mean_x])
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """
+        :return: the covariance of (a, b), with the conventions of curve_fit (inf for n = 2)
+        """
+        a, _ = self.params
+        if self.n == 2:
+            return np.full((2, 2), np.inf)
+        s2 = max(self.s_yy - a * self.s_xy, 0.0) / (self.n - 2)
+        var_a = s2 / self.s_xx
+        return np.array([[var_a, -self.mean_x * var_a],
+                         [-self.mean_x * var_a, s2 / self.n + self.mean_x**2 * var_a]])
+
+    @property
+    def errors(self) -> np.ndarray:
+        """
+        :return: the standard errors of (a, b)
+        """
+        return np.sqrt(np.diag(self.covariance))
+
+if __name__ == "__main__":
+    from l3_q5 import linear_func, x, y
+
+    regression = OnlineLinearRegression()
+    for xi, yi in zip(x, y):        # refit after every measurement without keeping the history
+        regression.update(xi, yi)
+        if len(regression) > 2:
+            print(f"n = {len(regression)}: a = {regression.params[0]:.4f} ± {regression.errors[0]:.4f}, "
+                  f"b = {regression.params[1]:.4f} ± {regression.errors[1]:.4f}")
+    params, covariance = curve_fit(linear_func, x, y)
+    print(f"curve_fit on all points: max difference {np.abs(params - regression.params).max():.1e} (parameters), "
+          f"{np.abs(covariance - regression.covariance).max():.1e} (covariance)")
+
+    # a long stream far from the origin, where sums of x^2 and x y would lose all digits
+    rng = np.random.default_rng(42)
+    n = 10**7
+    x_stream = 1e6 + rng.uniform(0, 1, n)
+    y_stream = 0.62 * x_stream + 2.5 + rng.normal(scale=0.01, size=n)
+    start = time.perf_counter()
+    chunks = [OnlineLinearRegression().update(xc, yc)       # e.g. one accumulator per worker
+              for xc, yc in zip(np.array_split(x_stream, 8), np.array_split(y_stream, 8))]
+    merged = OnlineLinearRegression()
+    for chunk in chunks:
+        merged.merge(chunk)
+    print(f"{n} points in 8 merged chunks: {time.perf_counter() - start:.2f} s, a = {merged.params[0]:.6f} ± {merged.errors[0]:.6f}")
+    reference = np.polyfit(x_stream - 1e6, y_stream, 1)
+    raw = (n * np.dot(x_stream, y_stream) - x_stream.sum() * y_stream.sum()) / (n * np.dot(x_stream, x_stream) - x_stream.sum()**2)
+    print(f"slope error vs polyfit on the shifted data: {abs(merged.params[0] - reference[0]):.1e} "
+          f"(from raw sums of x^2 and x y: {abs(raw - reference[0]):.1e})")
+    start = time.perf_counter()
+    for _ in range(10**5):
+        merged.params, merged.errors
+    print(f"query: {(time.perf_counter() - start) / 10**5 * 1e6:.1f} us")
@@ -0,0 +1,156 @@
+# ------------------------------------------------------------------------------------------------------------
+#   Bootstrap and jackknife error estimates for least-squares fits
+#   Updated: Oct 18, 2026
+#   Reference:
+#       B. Efron and R. J. Tibshirani, An Introduction to the Bootstrap (1993), chap. 9, 11 & 14
+#       https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+# ------------------------------------------------------------------------------------------------------------
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.optimize import curve_fit
+from scipy.special import ndtr, ndtri
+from batch_fit import batch_curve_fit, is_linear_in_params, num_params
+
+"""
+    sqrt(diag(covariance)) from curve_fit assumes independent Gaussian residuals. The bootstrap instead
+    refits the model to many resamples of the data and reads the errors off the spread of the refitted
+    parameters:
+        "pairs":     draw n of the points (x_i, y_i) with replacement;
+        "residuals": keep x, add the fitted residuals, drawn with replacement, to the fitted curve.
+    All resamples are drawn as one (m, n) index array (pairs resamples with fewer distinct points than
+    parameters are drawn again). A pairs resample is the original data with every point weighted by
+    its multiplicity, so all of them are solved at once by batch_curve_fit with sigma_i / sqrt(count_i)
+    (a point that was not drawn gets an infinite sigma); the jackknife (leave one point out) is the
+    special case of counts 1 - delta_ij.
+
+    The confidence intervals are percentile intervals, or BCa intervals, which correct the percentiles
+    for the bias and the skewness of the bootstrap distribution using the jackknife.
+
+    With workers > 1 the resamples are fitted in shards by a pool of processes (started with "spawn",
+    as jax does not support fork); f must then be picklable, i.e. defined at module level. Starting
+    the processes costs seconds, so this only pays off when the fits themselves are slow (nonlinear
+    models, many points); the resamples are drawn beforehand, so the result does not depend on it.
+"""
+
+def _fit_shard(f, x, Y, sigma, p0, linear):
+    return batch_curve_fit(f, x, Y, p0=p0, sigma=sigma, linear=linear)[0]
+
+def _fit_all(f, x, Y, sigma, p0, linear, workers):
+    if workers is None or workers <= 1:
+        return _fit_shard(f, x, Y, sigma, p0, linear)
+    shards = np.array_split(np.arange(Y.shape[0]), workers)
+    sigma_of = lambda rows: sigma[rows] if sigma.ndim == 2 else sigma
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_fit_shard, f, x, Y[rows], sigma_of(rows), p0, linear) for rows in shards]
+        return np.concatenate([future.result() for future in futures])
+
+def _prepare(f, x, y, sigma, p0, linear):
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    sigma = np.ones(y.size) if sigma is None else np.broadcast_to(np.asarray(sigma, dtype=np.float64), y.shape)
+    k = num_params(f, p0)
+    linear = is_linear_in_params(f, x, k) if linear is None else linear
+    params = batch_curve_fit(f, x, y, p0=p0, sigma=sigma, linear=linear)[0]
+    return x, y, sigma, linear, params
+
+def _weighted_fits(f, x, y, sigma, counts, p0, linear, workers):
+    with np.errstate(divide="ignore"):
+        sigma = sigma / np.sqrt(counts)
+    return _fit_all(f, x, np.broadcast_to(y, counts.shape), sigma, p0, linear, workers)
+
+def jackknife_fit(f, x: np.ndarray, y: np.ndarray, sigma: np.ndarray=None, p0: np.ndarray=None,
+                  linear: bool=None, workers: int=None):
+    """
+    :param f: the model f(x, *params)
+    :param x: the independent variable, shape (n,)
+    :param y: the data, shape (n,)
+    :param sigma: the uncertainties of the data points, shape (n,)
+    :param p0: the initial parameters for nonlinear models
+    :param linear: whether f is linear in its parameters; detected if None
+    :param workers: the number of processes; the fits run in this process if None
+    :return: the parameters fitted to all points, their jackknife standard errors, and a dict with the
+             leave-one-out parameters ("samples", shape (n, k)) and the bias-corrected parameters
+    """
+    x, y, sigma, linear, params = _prepare(f, x, y, sigma, p0, linear)
+    n = y.size
+    samples = _weighted_fits(f, x, y, sigma, 1.0 - np.eye(n), p0, linear, workers)
+    mean = samples.mean(axis=0)
+    errors = np.sqrt((n - 1) / n * np.sum((samples - mean) ** 2, axis=0))
+    return params, errors, {"samples": samples, "bias_corrected": n * params - (n - 1) * mean}
+
+def bootstrap_fit(f, x: np.ndarray, y: np.ndarray, n_resamples: int=10**4, kind: str="pairs",
+                  confidence: float=0.95, interval: str="percentile", sigma: np.ndarray=None,
+                  p0: np.ndarray=None, linear: bool=None, rng=None, workers: int=None):
+    """
+    :param f: the model f(x, *params)
+    :param x: the independent variable, shape (n,)
+    :param y: the data, shape (n,)
+    :param n_resamples: the number of bootstrap resamples
+    :param kind: "pairs" or "residuals", see above
+    :param confidence: the confidence level of the intervals
+    :param interval: "percentile" or "bca"
+    :param sigma: the uncertainties of the data points, shape (n,)
+    :param p0: the initial parameters for nonlinear models
+    :param linear: whether f is linear in its parameters; detected if None
+    :param rng: a np.random.Generator or seed
+    :param workers: the number of processes; the fits run in this process if None
+    :return: the parameters fitted to all points, the confidence intervals, shape (k, 2), and a dict
+             with the bootstrap parameters ("samples", shape (n_resamples, k)) and their standard
+             deviations ("errors")
+    """
+    assert kind in ("pairs", "residuals") and interval in ("percentile", "bca")
+    rng = np.random.default_rng(rng)
+    x, y, sigma, linear, params = _prepare(f, x, y, sigma, p0, linear)
+    n, m = y.size, n_resamples
+    index = rng.integers(0, n, size=(m, n))
+
+    if kind == "pairs":
+        counts = np.bincount((index + n * np.arange(m)[:, None]).ravel(), minlength=m * n).reshape(m, n)
+        while np.any(degenerate := np.count_nonzero(counts, axis=1) < params.size):
+            # fewer distinct points than parameters: the fit is undetermined, draw these resamples again
+            index = rng.integers(0, n, size=(np.count_nonzero(degenerate), n))
+            counts[degenerate] = [np.bincount(i, minlength=n) for i in index]
+        samples = _weighted_fits(f, x, y, sigma, counts, p0, linear, workers)
+    else:
+        fitted = np.asarray(f(x, *params), dtype=np.float64)
+        samples = _fit_all(f, x, fitted + (y - fitted)[index], sigma, p0, linear, workers)
+
+    alpha = (1 - confidence) / 2
+    quantiles = np.array([alpha, 1 - alpha])[:, None] * np.ones(params.size)
+    if interval == "bca":
+        z0 = ndtri(np.clip(np.mean(samples < params, axis=0), 1 / m, 1 - 1 / m))
+        leave_one_out = jackknife_fit(f, x, y, sigma, p0, linear, workers)[2]["samples"]
+        d = leave_one_out.mean(axis=0) - leave_one_out
+        acceleration = np.sum(d**3, axis=0) / (6 * np.sum(d**2, axis=0) ** 1.5)
+        z = ndtri(quantiles)
+        quantiles = ndtr(z0 + (z0 + z) / (1 - acceleration * (z0 + z)))
+    intervals = np.stack([np.quantile(samples[:, j], quantiles[:, j]) for j in range(params.size)])
+    return params, intervals, {"samples": samples, "errors": samples.std(axis=0, ddof=1)}
+
+if __name__ == "__main__":
+    from l3_q5 import linear_func, x, y
+
+    params, covariance = curve_fit(linear_func, x, y)
+    print(f"curve_fit:  a = {params[0]:.4f} ± {np.sqrt(covariance[0, 0]):.4f}, b = {params[1]:.4f} ± {np.sqrt(covariance[1, 1]):.4f}")
+    params, errors, _ = jackknife_fit(linear_func, x, y)
+    print(f"jackknife:  a = {params[0]:.4f} ± {errors[0]:.4f}, b = {params[1]:.4f} ± {errors[1]:.4f}")
+
+    for kind, interval in (("pairs", "percentile"), ("pairs", "bca"), ("residuals", "percentile")):
+        start = time.perf_counter()
+        params, intervals, info = bootstrap_fit(linear_func, x, y, kind=kind, interval=interval, rng=42)
+        print(f"bootstrap ({kind}, {interval}), {info['samples'].shape[0]} resamples in {time.perf_counter() - start:.2f} s: "
+              f"a in [{intervals[0, 0]:.4f}, {intervals[0, 1]:.4f}], b in [{intervals[1, 0]:.4f}, {intervals[1, 1]:.4f}]")
+
+    # the same resamples fitted by a pool of processes give the same intervals
+    _, pooled, _ = bootstrap_fit(linear_func, x, y, n_resamples=10**5, rng=42, workers=2)
+    _, serial, _ = bootstrap_fit(linear_func, x, y, n_resamples=10**5, rng=42)
+    print(f"10^5 resamples, 2 processes vs one: max difference {np.abs(pooled - serial).max():.1e}")
+
+    m = 200
+    rng = np.random.default_rng(42)
+    start = time.perf_counter()
+    for _ in range(m):
+        i = rng.integers(0, x.size, x.size)
+        curve_fit(linear_func, x[i], y[i])
+    print(f"curve_fit loop: {(time.perf_counter() - start) * 10**4 / m:.1f} s for 10^4 resamples (extrapolated)")
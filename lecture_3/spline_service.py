@@ -0,0 +1,167 @@
+# ------------------------------------------------------------------------------------------------------------
+#   Out-of-core cubic spline: chunked fit and evaluation on np.memmap arrays
+#   Updated: Oct 18, 2026
+#   Reference:
+#       C. de Boor, A Practical Guide to Splines, rev. ed. (2001), chap. IV
+#       https://numpy.org/doc/stable/reference/generated/numpy.lib.format.open_memmap.html
+# ------------------------------------------------------------------------------------------------------------
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from scipy.interpolate import CubicSpline
+from scipy.linalg import solve_banded
+
+"""
+    The spline is stored through its second derivatives M_i at the nodes, which satisfy
+        h_{i-1} M_{i-1} + 2 (h_{i-1} + h_i) M_i + h_i M_{i+1} = 6 (d_i - d_{i-1}),   d_i = (y_{i+1} - y_i) / h_i
+    plus two boundary conditions ("natural": M = 0 at both ends, "not-a-knot": the third derivative is
+    continuous at the second and the second-to-last nodes, as in scipy's CubicSpline).
+
+    The system is diagonally dominant, so the influence of a right-hand side entry decays at least by
+    a factor 2 per node. It can therefore be solved in windows of `chunk` unknowns padded by `margin`
+    nodes on each side, keeping only the interior of every window: with margin = 64 the truncation
+    error is below 2^-64 relative. Neither the fit nor the evaluation ever loads more than a chunk
+    of nodes or queries, so x, y, the queries and the output can be np.memmap arrays larger than RAM.
+
+    Unsorted queries locate their interval by binary search in x. Sorted queries (assume_sorted=True)
+    cover a contiguous range of intervals per chunk, so only that window of nodes is read, and the
+    node file is traversed once, front to back.
+"""
+
+class ChunkedCubicSpline:
+    """
+    Cubic spline interpolation with bounded memory use.
+    """
+    def __init__(self, x: np.ndarray, y: np.ndarray, bc_type: str="not-a-knot", chunk: int=2**20,
+                 margin: int=64, second_derivatives: np.ndarray=None):
+        """
+        :param x: the nodes, strictly increasing (array or np.memmap)
+        :param y: the values at the nodes (array or np.memmap)
+        :param bc_type: "not-a-knot" or "natural"
+        :param chunk: the number of nodes or queries processed at once
+        :param margin: the number of extra nodes on each side of a window of the fit
+        :param second_derivatives: an array (e.g. np.memmap) of len(x) float64 to store the second
+                                   derivatives in; allocated in memory if None
+        """
+        assert bc_type in ("not-a-knot", "natural")
+        assert x.ndim == 1 and x.shape == y.shape and x.size >= 4
+        self.x, self.y, self.chunk = x, y, chunk
+        self.M = np.empty(x.size) if second_derivatives is None else second_derivatives
+        self._fit(bc_type, margin)
+
+    def _fit(self, bc_type: str, margin: int):
+        n = self.x.size
+        unknowns = n - 2            # M_1, ..., M_{n-2}; M_0 and M_{n-1} follow from the boundary conditions
+        for start in range(0, unknowns, self.chunk):
+            stop = min(start + self.chunk, unknowns)
+            lo, hi = max(start - margin, 0), min(stop + margin, unknowns)
+            x = np.asarray(self.x[lo:hi + 2], dtype=np.float64)     # nodes lo, ..., hi + 1
+            y = np.asarray(self.y[lo:hi + 2], dtype=np.float64)
+            h = np.diff(x)
+            d = np.diff(y) / h
+            ab = np.zeros((3, hi - lo))
+            ab[0, 1:] = h[1:-1]                         # coefficient of M_{i+1}
+            ab[1] = 2 * (h[:-1] + h[1:])                # coefficient of M_i
+            ab[2, :-1] = h[1:-1]                        # coefficient of M_{i-1}
+            rhs = 6 * (d[1:] - d[:-1])
+            if bc_type == "not-a-knot" and lo == 0:     # eliminate M_0 = ((h0 + h1) M_1 - h0 M_2) / h1
+                h0, h1 = h[0], h[1]
+                ab[1, 0] = (h0 + h1) * (h0 + 2 * h1) / h1
+                ab[0, 1] = (h1**2 - h0**2) / h1
+            if bc_type == "not-a-knot" and hi == unknowns:
+                h0, h1 = h[-1], h[-2]                   # mirrored at the right end
+                ab[1, -1] = (h0 + h1) * (h0 + 2 * h1) / h1
+                ab[2, -2] = (h1**2 - h0**2) / h1
+            m = solve_banded((1, 1), ab, rhs, check_finite=False)
+            self.M[start + 1:stop + 1] = m[start - lo:stop - lo]
+
+        if bc_type == "natural":
+            self.M[0] = self.M[-1] = 0.0
+        else:
+            h0, h1 = self.x[1] - self.x[0], self.x[2] - self.x[1]
+            self.M[0] = ((h0 + h1) * self.M[1] - h0 * self.M[2]) / h1
+            h0, h1 = self.x[-1] - self.x[-2], self.x[-2] - self.x[-3]
+            self.M[-1] = ((h0 + h1) * self.M[-2] - h0 * self.M[-3]) / h1
+        if isinstance(self.M, np.memmap):
+            self.M.flush()
+
+    def _evaluate(self, q: np.ndarray, i: np.ndarray, offset: int, x: np.ndarray, y: np.ndarray,
+                  M: np.ndarray) -> np.ndarray:
+        # i are global interval indices; x, y and M hold the nodes offset, offset + 1, ...
+        j = i - offset
+        x0, x1, y0, y1, m0, m1 = x[j], x[j + 1], y[j], y[j + 1], M[j], M[j + 1]
+        h = x1 - x0
+        a, b = x1 - q, q - x0
+        return (m0 * a**3 + m1 * b**3) / (6 * h) + (y0 / h - m0 * h / 6) * a + (y1 / h - m1 * h / 6) * b
+
+    def __call__(self, q: np.ndarray, out: np.ndarray=None, assume_sorted: bool=False) -> np.ndarray:
+        """
+        :param q: the query points, a 1-D array or np.memmap (points outside the nodes are extrapolated)
+        :param out: an array (e.g. np.memmap) of len(q) float64 for the results; allocated if None
+        :param assume_sorted: whether q is sorted in increasing order
+        :return: out, the spline at q
+        """
+        q_all = q
+        out = np.empty(q_all.shape[0]) if out is None else out
+        n = self.x.size
+        for start in range(0, q_all.shape[0], self.chunk):
+            q = np.asarray(q_all[start:start + self.chunk], dtype=np.float64)
+            if assume_sorted:
+                first, last = np.searchsorted(self.x, q[[0, -1]], side="right") - 1
+                first, last = min(max(first, 0), n - 2), min(max(last, 0), n - 2)
+                if last - first <= 4 * self.chunk:          # the node window is small: read it sequentially
+                    x = np.asarray(self.x[first:last + 2], dtype=np.float64)
+                    i = first + np.clip(np.searchsorted(x, q, side="right") - 1, 0, x.size - 2)
+                    out[start:start + q.size] = self._evaluate(q, i, first, x, np.asarray(self.y[first:last + 2]),
+                                                               np.asarray(self.M[first:last + 2]))
+                    continue
+            i = np.clip(np.searchsorted(self.x, q, side="right") - 1, 0, n - 2)
+            lo, hi = i.min(), i.max() + 2
+            if hi - lo <= 4 * self.chunk:
+                out[start:start + q.size] = self._evaluate(q, i, lo, np.asarray(self.x[lo:hi]),
+                                                           np.asarray(self.y[lo:hi]), np.asarray(self.M[lo:hi]))
+            else:       # scattered queries: gather only the nodes that are needed
+                nodes = np.unique(np.concatenate([i, i + 1]))
+                j = np.searchsorted(nodes, i)
+                out[start:start + q.size] = self._evaluate(q, j, 0, np.asarray(self.x[nodes]),
+                                                           np.asarray(self.y[nodes]), np.asarray(self.M[nodes]))
+        if isinstance(out, np.memmap):
+            out.flush()
+        return out
+
+if __name__ == "__main__":
+    n, n_queries = 10**6, 2 * 10**7
+    with tempfile.TemporaryDirectory() as directory:
+        path = lambda name: os.path.join(directory, name)
+        open_memmap = np.lib.format.open_memmap
+        x = open_memmap(path("x.npy"), mode="w+", dtype=np.float64, shape=(n,))
+        y = open_memmap(path("y.npy"), mode="w+", dtype=np.float64, shape=(n,))
+        x[:] = np.linspace(0, 100, n) + 0.4 * 100 / n * np.sin(np.arange(n))     # slightly nonuniform nodes
+        y[:] = np.sin(x)
+        q = open_memmap(path("q.npy"), mode="w+", dtype=np.float64, shape=(n_queries,))
+        for start in range(0, n_queries, 2**22):
+            q[start:start + 2**22] = np.linspace(0, 100, n_queries)[start:start + 2**22]
+        out = open_memmap(path("out.npy"), mode="w+", dtype=np.float64, shape=(n_queries,))
+        M = open_memmap(path("M.npy"), mode="w+", dtype=np.float64, shape=(n,))
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        spline = ChunkedCubicSpline(x, y, chunk=2**18, second_derivatives=M)
+        fitted = time.perf_counter()
+        spline(q, out, assume_sorted=True)
+        evaluated = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"fit of {n} nodes: {fitted - start:.2f} s, {n_queries} sorted queries: {evaluated - fitted:.2f} s, "
+              f"peak memory {peak / 2**20:.0f} MiB")
+
+        sample = np.random.default_rng(42).choice(n_queries, 10**5, replace=False)
+        reference = CubicSpline(np.asarray(x), np.asarray(y))
+        print(f"max difference to scipy CubicSpline: {np.abs(out[sample] - reference(q[sample])).max():.1e}")
+        start = time.perf_counter()
+        unsorted = spline(q[sample])
+        print(f"{sample.size} unsorted queries: {time.perf_counter() - start:.2f} s, "
+              f"max difference {np.abs(unsorted - reference(q[sample])).max():.1e}")
+        del x, y, q, out, M, spline
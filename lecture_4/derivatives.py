@@ -0,0 +1,75 @@
+# ---------------------------------------------------------------------------------------------
+#   Derivatives by automatic differentiation, compiled once and evaluated on whole arrays
+#   Updated: Oct 18, 2026
+#   Reference:
+#       https://docs.jax.dev/en/latest/_autosummary/jax.vmap.html
+#       https://docs.jax.dev/en/latest/_autosummary/jax.jit.html
+# ---------------------------------------------------------------------------------------------
+from functools import lru_cache
+import time
+import jax
+import jax.numpy as jnp
+import numpy as np
+from jax import grad, jit, vmap
+
+"""
+    `lambda x: grad(f)(x)` builds the grad transformation anew and dispatches eagerly on every call,
+    so differentiating at 10^6 points one by one takes minutes. derivative(f, order) wraps f once
+    into jit(vmap(grad(...grad(f)))) and evaluates arrays of any shape in a single call; the
+    compiled function is cached by (f, order, dtype), and jax caches one compilation per input size.
+
+    SciPy routines such as optimize.newton call fprime with one scalar at a time: scalar_derivative
+    returns a compiled scalar function that hands back Python floats.
+"""
+
+@lru_cache(maxsize=None)
+def _compiled(f, order: int, dtype: np.dtype, batched: bool):
+    d = f
+    for _ in range(order):
+        d = grad(d)
+    cast = lambda x: d(jnp.asarray(x, dtype=dtype))     # inside the trace, so dtype is what f sees
+    return jit(vmap(cast)) if batched else jit(cast)
+
+def _dtype(x) -> np.dtype:
+    return jax.dtypes.canonicalize_dtype(np.result_type(x, np.float32))
+
+def derivative(f, order: int=1):
+    """
+    :param f: a scalar function of a scalar, written with jax.numpy (must be hashable, e.g. a lambda)
+    :param order: the order of the derivative
+    :return: a function evaluating the derivative elementwise on scalars or arrays of any shape
+    """
+    def evaluate(x):
+        x = np.asarray(x)
+        values = _compiled(f, order, _dtype(x), True)(x.ravel())
+        return np.asarray(values).reshape(x.shape)[()]
+
+    return evaluate
+
+def scalar_derivative(f, order: int=1):
+    """
+    :param f: a scalar function of a scalar, written with jax.numpy
+    :param order: the order of the derivative
+    :return: a compiled scalar function returning Python floats, e.g. for scipy.optimize
+    """
+    def evaluate(x: float) -> float:
+        return float(_compiled(f, order, _dtype(x), False)(x))
+
+    return evaluate
+
+if __name__ == "__main__":
+    f = lambda x: jnp.sin(x)
+    f_prime, f_second = derivative(f), derivative(f, order=2)
+    x = np.linspace(0, 2 * np.pi, 10**6)
+
+    f_prime(x)      # compilation
+    start = time.perf_counter()
+    values = f_prime(x)
+    print(f"f' at {x.size} points: {(time.perf_counter() - start) * 1e3:.1f} ms, "
+          f"max error = {np.abs(values - np.cos(x)).max():.1e}")
+    print(f"f'' max error = {np.abs(f_second(x) - (-np.sin(x))).max():.1e}")
+
+    m = 1000
+    start = time.perf_counter()
+    [grad(f)(xi) for xi in x[:m]]
+    print(f"per-point grad(f)(x): {(time.perf_counter() - start) * x.size / m:.1f} s for {x.size} points (extrapolated)")
@@ -4,37 +4,24 @@
 #   Updated: Mar 12, 2025
 # ---------------------------------------------------------------------------------------------
 from jax.numpy import sin, pi
-from jax import grad
+from derivatives import derivative
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.linalg import solve
+from spline_derivative import spline_derivative
 
 f = lambda x: sin(x)
-f_prime_ad = lambda x: grad(f)(x)
+f_prime_ad = derivative(f)     # compiled once, evaluates whole arrays
 a, b = 0, 2 * pi
 
-def tridiagonal_matrix(n):
-    A = np.zeros((n, n))
-    np.fill_diagonal(A, 4)  # diagonal
-    np.fill_diagonal(A[:-1, 1:], 1)  # sub-diagonal
-    np.fill_diagonal(A[1:, :-1], 1)  # sub-diagonal
-    return A
-
 if __name__ == "__main__":
     n = 65
     x_data = np.linspace(a, b, n + 1)       # x_0, x_1, ..., x_n
-    dx = x_data[1] - x_data[0]
     m_0, m_n = f_prime_ad(x_data[0]), f_prime_ad(x_data[-1])
-    f_data = np.array([f(x_data[k + 2]) - f(x_data[k]) for k in range(n - 1)])
-
-    bias_term = np.zeros(n - 1)
-    bias_term[0], bias_term[-1] = m_0, m_n
 
-    A = tridiagonal_matrix(n - 1)
-    b = 3 / dx * f_data - bias_term
-    m = solve(A, b) # solve the linear equations
+    # m_{i-1} + 4 m_i + m_{i+1} = 3 / h (f_{i+1} - f_{i-1}), solved in banded form in O(n)
+    m = spline_derivative(x_data, np.asarray(f(x_data)), m_0, m_n)[1:-1]
 
     plt.plot(x_data[1:-1], m, label="Simpson method", linestyle="", marker="o")
-    plt.plot(x_data, [f_prime_ad(x) for x in x_data], linestyle="-", label="Automatic differentiation")
+    plt.plot(x_data, f_prime_ad(x_data), linestyle="-", label="Automatic differentiation")
     plt.legend()
     plt.show()
\ No newline at end of file
@@ -5,6 +5,7 @@
 #   Updated: Mar 12, 2025
 # ---------------------------------------------------------------------------------------------
 import numpy as np
+from quadrature import integrate
 from typing import Callable
 
 f = lambda x: 4 / (1 + x * x)
@@ -46,4 +47,13 @@ if __name__ == "__main__":
     print(f"result (simpson 1 / 3) = {result_simpson_1_3}")
 
     result_simpson_8_3 = simpson_3_8(f, a, b, n)
-    print(f"result (simpson 8 / 3) = {result_simpson_8_3}")
\ No newline at end of file
+    print(f"result (simpson 8 / 3) = {result_simpson_8_3}")
+
+    result_gauss = integrate(f, a, b, n=16)    # 16 cached Gauss-Legendre nodes
+    print(f"result (Gauss-Legendre, 16 points) = {result_gauss}")
+
+    # errors against pi: the trapezoidal rule is still at 1e-9 with 10^4 points, Simpson needs ~100
+    print(f"Gauss-Legendre error with 16 points: {abs(result_gauss - np.pi):.1e}")
+    for n in (100, 1000, 10000):
+        print(f"n = {n}: trapezoidal error {abs(trapezoidal_rule(f, a, b, n) - np.pi):.1e}, "
+              f"Simpson 1/3 error {abs(simpson_1_3(f, a, b, n) - np.pi):.1e}")
\ No newline at end of file
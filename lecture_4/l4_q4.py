@@ -5,6 +5,7 @@
 #   Updated: Mar 12, 2025
 # ---------------------------------------------------------------------------------------------
 import numpy as np
+from quadrature import integrate
 f = lambda x: 4 / (1 + x * x)
 
 def composite_trapezoidal_rule(f, a, b, n):
@@ -28,3 +29,6 @@ if __name__ == "__main__":
 
     result_composite_simpson = composite_simpson_rule(f, a, b, n)
     print(f"result (composite simpson) = {result_composite_simpson}")
+
+    result_gauss = integrate(f, a, b, n=16)    # 16 cached Gauss-Legendre nodes
+    print(f"result (Gauss-Legendre, 16 points) = {result_gauss}")
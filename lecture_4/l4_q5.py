@@ -4,9 +4,10 @@
 #   Author: Yi-Ming Ding
 #   Updated: Mar 12, 2025
 # ---------------------------------------------------------------------------------------------
+import heapq
+import time
 from numpy import log
 import numpy as np
-from l4_q3 import trapezoidal_rule
 
 f = lambda x: log(1 + x) / (1 + x * x)
 
@@ -15,34 +16,112 @@ def simpson_rule(f, a, b):
     h = (b - a) / 6
     return h * (f(a) + 4 * f(c) + f(b))
 
-# recursive function
-def adaptive_simpson(f, a, b, tol=1e-7):
-    S = simpson_rule(f, a, b)  # the full integral
-    c = (a + b) / 2
-    S_left = simpson_rule(f, a, c)  # integrating in the left interval
-    S_right = simpson_rule(f, c, b)  # integrating in the right interval
+"""
+    adaptive_simpson keeps the subintervals in a priority queue ordered by their error estimate. Each
+    entry stores f at its ends, midpoint and quarter points, which give Simpson's rule on the whole
+    interval (S_1) and on its two halves (S_2); the error of S_2 is about |S_2 - S_1| / 15, and
+    S_2 + (S_2 - S_1) / 15 is the extrapolated value. Every generation pops the intervals with the
+    largest errors until the others sum below tol, and splits them: each child inherits three of
+    its parent's five values and needs only its two new quarter points, all of which are evaluated
+    in one vectorized call to f. No value is computed twice and there is no recursion depth limit.
 
-    if abs(S_left + S_right - S) < tol:
-        return S_left + S_right + (S_left + S_right - S)
-    else:
-        return adaptive_simpson(f, a, c, tol / 2) + adaptive_simpson(f, c, b, tol / 2)  # continue the recursion
+    tol is a global bound: refinement goes on, largest error estimate first, until the sum over all
+    subintervals of |S_2 - S_1| / 15 falls below it.
+"""
 
-def romberg_method(f, a, b, max_iter=10, tol=1e-7):
-    R = np.zeros((max_iter, max_iter))  # Romberg tabel
+def adaptive_simpson(f, a, b, tol=1e-7, max_eval=10**6, full_output=False):
+    """
+    :param f: the integrand, vectorized over arrays
+    :param a: left end point
+    :param b: right end point
+    :param tol: the global target for the sum of the error estimates |S_2 - S_1| / 15 of all the
+                subintervals
+    :param max_eval: the budget of function evaluations
+    :param full_output: also return a dict with the number of evaluations, subintervals and
+                        generations, the error estimate and the convergence flag
+    :return: the value of the integral
+    """
+    def entries(lo, hi, values):
+        # values: f at lo, lo + h/4, lo + h/2, lo + 3h/4, hi, shape (5, k)
+        h = (hi - lo) / 6
+        whole = h * (values[0] + 4 * values[2] + values[4])
+        halves = h / 2 * (values[0] + 4 * values[1] + 2 * values[2] + 4 * values[3] + values[4])
+        return [(-abs(d) / 15, l, r, tuple(v), s + d / 15)
+                for d, l, r, v, s in zip(halves - whole, lo, hi, values.T, halves)]
 
-    for i in range(max_iter):
-        n = 2 ** i  # equally division into 2^i intervals
-        R[i, 0] = trapezoidal_rule(f, a, b, n)
+    x = np.linspace(a, b, 5)
+    heap = entries(np.array([a]), np.array([b]), np.asarray(f(x), dtype=np.float64)[:, None])
+    evaluations, generations = 5, 0
+    error = -heap[0][0]
+    while error > tol and evaluations + 4 <= max_eval:
+        refine = []
+        while heap and error > tol and 4 * (len(refine) + 1) + evaluations <= max_eval:
+            entry = heapq.heappop(heap)
+            error += entry[0]
+            refine.append(entry)
+        _, lo, hi, values, _ = map(np.array, zip(*refine))
+        values = values.T                                           # (5, k)
+        if np.any((hi - lo) / 4 <= np.spacing(np.maximum(np.abs(lo), np.abs(hi)))):
+            for entry in refine:                                    # no room left between the points
+                heapq.heappush(heap, entry)
+            error = -sum(entry[0] for entry in heap)
+            break
+        q = (hi - lo) / 8
+        new = np.asarray(f(np.concatenate([lo + q, lo + 3 * q, lo + 5 * q, lo + 7 * q])),
+                         dtype=np.float64).reshape(4, -1)
+        mid = (lo + hi) / 2
+        children = entries(lo, mid, np.stack([values[0], new[0], values[1], new[1], values[2]])) \
+                   + entries(mid, hi, np.stack([values[2], new[2], values[3], new[3], values[4]]))
+        for entry in children:
+            heapq.heappush(heap, entry)
+            error -= entry[0]
+        evaluations += new.size
+        generations += 1
 
-        # consider the iteration
-        for j in range(1, i + 1):
-            R[i, j] = (4 ** j * R[i, j - 1] - R[i - 1, j - 1]) / (4 ** j - 1)
+    result = sum(entry[4] for entry in heap)
+    error = -sum(entry[0] for entry in heap)
+    if not full_output:
+        if error > tol:
+            raise ValueError(f"Failed to reach the tolerance within {max_eval} evaluations (error {error:.1e})")
+        return result
+    return result, {"evaluations": evaluations, "intervals": len(heap), "generations": generations,
+                    "error": error, "converged": error <= tol}
+
+def romberg_method(f, a, b, max_iter=10, tol=1e-7, full_output=False):
+    """
+    Romberg integration. The trapezoidal rule with 2^i intervals reuses the one with 2^{i-1}:
+        T_i = T_{i-1} / 2 + h_i sum_j f(a + (2j - 1) h_i),   h_i = (b - a) / 2^i
+    so level i evaluates f only at its 2^{i-1} new midpoints, and the Richardson extrapolation
+        R[i, j] = (4^j R[i, j - 1] - R[i - 1, j - 1]) / (4^j - 1)
+    needs only the previous row of the table.
 
-        # if it converges, return the results
-        if i > 0 and abs(R[i, i] - R[i - 1, i - 1]) < tol:
-            return R[i, i]
+    :param f: the integrand, vectorized: f(x) for points x of shape (k,) returns shape (k,) or
+              (k, ...) for vector-valued or batched (e.g. parameterized) integrands
+    :param a: left end point
+    :param b: right end point
+    :param max_iter: the maximum number of levels (2^(max_iter - 1) intervals at most)
+    :param tol: the convergence threshold on every component of the diagonal entries
+    :param full_output: also return a dict with the number of evaluations, levels and convergence flag
+    :return: the value of the integral, a float or an array of the integrand's value shape
+    """
+    values = np.asarray(f(np.array([a, b], dtype=np.float64)), dtype=np.float64)
+    previous = [(b - a) / 2 * (values[0] + values[1])]      # the last row of the Romberg table
+    evaluations, converged = 2, False
+    for i in range(1, max_iter):
+        h = (b - a) / 2**i
+        midpoints = a + h * np.arange(1, 2**i, 2)
+        row = [previous[0] / 2 + h * np.asarray(f(midpoints), dtype=np.float64).sum(axis=0)]
+        evaluations += midpoints.size
+        for j in range(1, i + 1):
+            row.append((4**j * row[j - 1] - previous[j - 1]) / (4**j - 1))
+        converged = np.all(np.abs(row[i] - previous[i - 1]) < tol)
+        previous = row
+        if converged:
+            break
 
-    return R[max_iter - 1, max_iter - 1]
+    result = previous[-1][()]
+    return (result, {"evaluations": evaluations, "levels": len(previous), "converged": bool(converged)}) \
+        if full_output else result
 
 if __name__ == "__main__":
     x_data = np.linspace(0, 1, 100)
@@ -52,5 +131,23 @@ if __name__ == "__main__":
     result_adaptive_simpson = adaptive_simpson(f, a, b)
     print(f"Result (adaptive Simpson) = {result_adaptive_simpson}")
 
+    exact = np.pi / 8 * np.log(2)
+    for tol in (1e-7, 1e-12):
+        result, info = adaptive_simpson(f, a, b, tol=tol, full_output=True)
+        print(f"tol = {tol:.0e}: error {abs(result - exact):.1e}, {info['evaluations']} evaluations of f "
+              f"in {info['generations']} vectorized calls, {info['intervals']} subintervals")
+    start = time.perf_counter()
+    result, info = adaptive_simpson(lambda x: np.sqrt(x), 0, 1, tol=1e-14, full_output=True)
+    print(f"sqrt(x) on [0, 1], tol = 1e-14: error {abs(result - 2 / 3):.1e}, {info['evaluations']} evaluations, "
+          f"{time.perf_counter() - start:.2f} s")
+
     result_romberg = romberg_method(f, a, b)
-    print(f"Result (romberg method) = {result_romberg}")
\ No newline at end of file
+    print(f"Result (romberg method) = {result_romberg}")
+
+    # a family of integrands: \int_0^1 ln(1 + p x) / (1 + x^2) dx for 1000 values of p, in one call
+    p = np.linspace(0, 2, 1001)
+    family = lambda x: log(1 + p * x[:, None]) / (1 + x[:, None] ** 2)
+    start = time.perf_counter()
+    results, info = romberg_method(family, a, b, max_iter=20, tol=1e-12, full_output=True)
+    print(f"{p.size} integrands: {time.perf_counter() - start:.3f} s, {info['evaluations']} points, "
+          f"{info['levels']} levels, error at p = 1: {abs(results[500] - exact):.1e}")
\ No newline at end of file
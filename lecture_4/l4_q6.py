@@ -3,42 +3,123 @@
 #   Author: Yi-Ming Ding
 #   Updated: Mar 12, 2025
 # ---------------------------------------------------------------------------------------------
+import math
+import time
 import numpy as np
 from numpy import sqrt
 import matplotlib.pyplot as plt
 from tqdm import tqdm
+from monte_carlo import mc_integrate
 
-def mc_pi_solver(n_tot: int):
+"""
+    The points are drawn in chunks of `chunk` pairs from a np.random.Generator into one reused buffer,
+    and the hits are counted with an array reduction, so memory use does not grow with n_tot. The
+    samples are Bernoulli variables (4 for a hit, 0 otherwise), so the running count of hits gives
+    the sample variance exactly, var = 16 n_inside (n_tot - n_inside) / (n_tot (n_tot - 1)), and the
+    standard error of the estimate is sqrt(var / n_tot).
+
+    For plotting, a uniform sample of `reservoir` points is kept with Li's reservoir sampling
+    (Algorithm L): the gaps between replacements are drawn from their geometric distribution, so only
+    O(reservoir log(n_tot / reservoir)) points are ever touched individually.
+"""
+
+class ReservoirSample:
     """
-    :param n_tot: number of samples
-    :return: the estimation of pi
+    A uniform random sample of fixed size from a stream of points.
     """
-    x_inside, y_inside = [], []
-    x_outside, y_outside = [], []
+    def __init__(self, size: int, dim: int, rng: np.random.Generator):
+        """
+        :param size: the number of points kept
+        :param dim: the dimension of the points
+        :param rng: the random number generator
+        """
+        self.points = np.empty((size, dim))
+        self.rng, self.seen, self.filled = rng, 0, 0
+        self.w = math.exp(math.log(rng.random()) / size)
+        self.next = size - 1    # the last filled index; _skip moves it to the first replacement
+
+    def _skip(self):
+        self.next += int(math.log(self.rng.random()) / math.log1p(-self.w)) + 1
+        self.w *= math.exp(math.log(self.rng.random()) / self.points.shape[0])
+
+    def offer(self, points: np.ndarray):
+        """
+        :param points: the next points of the stream, shape (c, dim)
+        """
+        size = self.points.shape[0]
+        if self.filled < size:
+            taken = min(size - self.filled, points.shape[0])
+            self.points[self.filled:self.filled + taken] = points[:taken]
+            self.filled += taken
+            if self.filled == size:
+                self._skip()
+        end = self.seen + points.shape[0]
+        while self.filled == size and self.next < end:
+            self.points[self.rng.integers(size)] = points[self.next - self.seen]
+            self._skip()
+        self.seen = end
 
-    n_inside, n_outside = 0, 0
+    @property
+    def sample(self) -> np.ndarray:
+        return self.points[:self.filled]
 
-    for _ in tqdm(range(n_tot)):
-        x, y = np.random.uniform(0, 1), np.random.uniform(0, 1)
-        if sqrt(x * x + y * y) < 1:
-            n_inside += 1
-            x_inside.append(x)
-            y_inside.append(y)
-        else:
-            n_outside += 1
-            x_outside.append(x)
-            y_outside.append(y)
+def mc_pi_solver(n_tot: int, chunk: int=2**20, reservoir: int=10**4, rng=None, progress: bool=True):
+    """
+    :param n_tot: number of samples
+    :param chunk: number of samples drawn at once
+    :param reservoir: number of sample points kept for plotting
+    :param rng: a np.random.Generator or seed
+    :param progress: whether to show a progress bar over the chunks
+    :return: the estimation of pi, its standard error, and the x and y of the kept points inside
+             and outside the quarter circle
+    """
+    rng = np.random.default_rng(rng)
+    buffer = np.empty(2 * min(chunk, n_tot))
+    kept = ReservoirSample(reservoir, 2, rng)
+    n_inside = 0
+    for start in tqdm(range(0, n_tot, chunk), disable=not progress):
+        c = min(chunk, n_tot - start)
+        x, y = rng.random(out=buffer[:2 * c]).reshape(2, c)
+        n_inside += np.count_nonzero(x * x + y * y < 1)
+        kept.offer(buffer[:2 * c].reshape(2, c).T)
 
-    pi_estimated = 4.0 * float(n_inside) / float(n_tot)
-    return pi_estimated, x_inside, x_outside, y_inside, y_outside
+    pi_estimated = 4.0 * n_inside / n_tot
+    variance = 16.0 * n_inside * (n_tot - n_inside) / (n_tot * max(n_tot - 1, 1))
+    x, y = kept.sample.T
+    inside = x * x + y * y < 1
+    return pi_estimated, sqrt(variance / n_tot), x[inside], x[~inside], y[inside], y[~inside]
 
 quarter_circle = lambda x: sqrt(1 - x * x)
 
 if __name__ == "__main__":
-    n = int(1e5)    # number of samples
-    pi_estimated, x_inside, x_outside, y_inside, y_outside = mc_pi_solver(n)
+    # every stream position must be kept with probability size / N, including size - 1 and size
+    size, length, trials = 5, 20, 40000
+    rng = np.random.default_rng(0)
+    counts = np.zeros(length)
+    for _ in range(trials):
+        reservoir = ReservoirSample(size, 1, rng)
+        stream = np.arange(length, dtype=np.float64)[:, None]
+        for chunk in np.array_split(stream, 3):     # chunk boundaries that do not align with size
+            reservoir.offer(chunk)
+        counts[reservoir.sample[:, 0].astype(int)] += 1
+    frequency, expected = counts / trials, size / length
+    assert np.all(np.abs(frequency - expected) < 5 * np.sqrt(expected * (1 - expected) / trials)), frequency
+    print(f"reservoir of {size} over {length} items: kept frequencies in [{frequency.min():.3f}, {frequency.max():.3f}], "
+          f"expected {expected:.3f}")
+
+    n = int(1e8)    # number of samples
+    start = time.perf_counter()
+    pi_estimated, error, x_inside, x_outside, y_inside, y_outside = mc_pi_solver(n, rng=42)
+    elapsed = time.perf_counter() - start
+    print(f"pi = {pi_estimated:.6f} ± {error:.6f} (actual error {abs(pi_estimated - np.pi):.1e}), "
+          f"{n / elapsed:.2e} samples/s, {x_inside.size + x_outside.size} points kept for plotting")
+
+    # the same area with the general integrator: stratified and scrambled Sobol sampling of 4 * [x^2 + y^2 < 1]
+    for method in ("stratified", "sobol"):
+        estimate, error, _ = mc_integrate(lambda p: 4.0 * (np.sum(p * p, axis=1) < 1), [0, 0], [1, 1], 10**7, method, seed=42)
+        print(f"{method}: pi = {estimate:.6f} ± {error:.6f} (actual error {abs(estimate - np.pi):.1e})")
 
-    plt.title(fr"$n={n}$, $\pi\approx${pi_estimated}")
+    plt.title(fr"$n={n}$, $\pi\approx${pi_estimated:.5f}$\pm${error:.5f}")
     plt.plot(x_inside, y_inside, marker="o", color="red", markersize=2.5, linestyle="")
     plt.plot(x_outside, y_outside, marker="s", color="blue", markersize=2.5, linestyle="")
 
@@ -0,0 +1,84 @@
+# ---------------------------------------------------------------------------------------------
+#   Gauss-Legendre and Clenshaw-Curtis quadrature with cached nodes, for batches of integrands
+#   Updated: Oct 18, 2026
+#   Reference:
+#       L. N. Trefethen, Is Gauss quadrature better than Clenshaw-Curtis?, SIAM Rev. 50, 67 (2008)
+#       https://numpy.org/doc/stable/reference/generated/numpy.polynomial.legendre.leggauss.html
+# ---------------------------------------------------------------------------------------------
+from functools import lru_cache
+import time
+import numpy as np
+
+"""
+    An n-point rule sum_k w_k f(x_k) integrates polynomials of degree 2n - 1 exactly (Gauss-Legendre)
+    or n - 1 (Clenshaw-Curtis, x_k = cos(k pi / (n - 1))); for integrands analytic near [a, b] both
+    converge geometrically, so a dozen or two points reach machine precision, where Simpson's rule
+    (error O(h^4)) needs hundreds and the trapezoidal rule (O(h^2)) stays far from it at 10^4.
+
+    The nodes and weights on [-1, 1] depend only on n and are computed once and cached (read-only);
+    rule(n, a, b) maps them to [a, b]. For a family of integrands sampled at the nodes, shape
+    (m, n), all m integrals are one matrix-vector product with the weights.
+"""
+
+@lru_cache(maxsize=None)
+def gauss_legendre(n: int) -> tuple:
+    """
+    :return: the n Gauss-Legendre nodes and weights on [-1, 1]
+    """
+    x, w = np.polynomial.legendre.leggauss(n)
+    x.flags.writeable = w.flags.writeable = False
+    return x, w
+
+@lru_cache(maxsize=None)
+def clenshaw_curtis(n: int) -> tuple:
+    """
+    :return: the n >= 2 Clenshaw-Curtis nodes (Chebyshev extreme points) and weights on [-1, 1]
+    """
+    N = n - 1
+    k = np.arange(n)
+    x = np.cos(np.pi * k / N)
+    j = np.arange(1, N // 2 + 1)
+    b = np.where(2 * j == N, 1.0, 2.0)
+    w = 1 - (b / (4 * j**2 - 1)) @ np.cos(2 * np.pi * np.outer(j, k) / N)
+    w *= np.where((k == 0) | (k == N), 1.0, 2.0) / N
+    x.flags.writeable = w.flags.writeable = False
+    return x, w
+
+_RULES = {"gauss": gauss_legendre, "clenshaw-curtis": clenshaw_curtis}
+
+def rule(n: int, a: float=-1.0, b: float=1.0, kind: str="gauss") -> tuple:
+    """
+    :param n: the number of nodes
+    :param a: left end point
+    :param b: right end point
+    :param kind: "gauss" (Gauss-Legendre) or "clenshaw-curtis"
+    :return: the nodes and weights on [a, b]
+    """
+    x, w = _RULES[kind](n)
+    return (a + b) / 2 + (b - a) / 2 * x, (b - a) / 2 * w
+
+def integrate(f, a: float, b: float, n: int=32, kind: str="gauss"):
+    """
+    :param f: the integrand, vectorized: f(x) for the nodes x, shape (n,), returns shape (n,), or
+              (m, n) for a batch of m integrands (e.g. one row per parameter value)
+    :param a: left end point
+    :param b: right end point
+    :param n: the number of nodes
+    :param kind: "gauss" or "clenshaw-curtis"
+    :return: the integral, a float or shape (m,)
+    """
+    x, w = rule(n, a, b, kind)
+    return (np.asarray(f(x), dtype=np.float64) @ w)[()]
+
+if __name__ == "__main__":
+    f = lambda x: 4 / (1 + x * x)
+    for n in (8, 16, 24, 32):
+        print(f"n = {n:2d}: Gauss-Legendre error {abs(integrate(f, 0, 1, n) - np.pi):.1e}, "
+              f"Clenshaw-Curtis error {abs(integrate(f, 0, 1, n, 'clenshaw-curtis') - np.pi):.1e}")
+
+    # \int_0^1 4 / (1 + p^2 x^2) dx = 4 arctan(p) / p for 10^6 values of p: one (m, n) @ (n,) product
+    p = np.linspace(0.1, 2, 10**6)
+    start = time.perf_counter()
+    values = integrate(lambda x: 4 / (1 + (p[:, None] * x) ** 2), 0, 1, n=40)
+    print(f"{p.size} integrals with 40 nodes: {time.perf_counter() - start:.2f} s, "
+          f"max error {np.abs(values - 4 * np.arctan(p) / p).max():.1e}")
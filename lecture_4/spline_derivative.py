@@ -0,0 +1,82 @@
+# ---------------------------------------------------------------------------------------------
+#   Derivatives of sampled functions from the interpolating cubic spline, in O(n)
+#   Updated: Oct 18, 2026
+#   Reference:
+#       C. de Boor, A Practical Guide to Splines, rev. ed. (2001), chap. IV
+#       https://docs.scipy.org/doc/scipy/reference/generated/scipy.linalg.solve_banded.html
+# ---------------------------------------------------------------------------------------------
+import time
+import numpy as np
+from scipy.interpolate import CubicSpline
+from scipy.linalg import solve_banded
+
+"""
+    The slopes m_i of the cubic spline through (x_i, f_i) satisfy, with h_i = x_{i+1} - x_i and
+    d_i = (f_{i+1} - f_i) / h_i,
+        h_i m_{i-1} + 2 (h_{i-1} + h_i) m_i + h_{i-1} m_{i+1} = 3 (h_i d_{i-1} + h_{i-1} d_i)
+    which for equal steps is the Simpson-type relation m_{i-1} + 4 m_i + m_{i+1} = 3 (f_{i+1} - f_{i-1}) / h.
+    The ends are either clamped (m_0 and m_n given) or not-a-knot, i.e. the third derivative is
+    continuous at x_1 and x_{n-1} as in scipy's CubicSpline, which still gives a tridiagonal row:
+        h_1 m_0 + (h_0 + h_1) m_1 = ((h_0 + 2 (h_0 + h_1)) h_1 d_0 + h_0^2 d_1) / (h_0 + h_1)
+
+    The system is stored in the (3, n + 1) banded layout of solve_banded and solved by banded LU in
+    O(n) time and memory, for all the sampled functions of a batch at once (one right-hand side column
+    each), instead of a dense (n - 1) x (n - 1) matrix and an O(n^3) solve.
+"""
+
+def spline_derivative(x: np.ndarray, y: np.ndarray, m_0=None, m_n=None, axis: int=-1) -> np.ndarray:
+    """
+    :param x: the grid, strictly increasing, shape (n + 1,), not necessarily uniform
+    :param y: the samples, with n + 1 entries along axis; other axes are a batch of functions
+    :param m_0: the derivative at x[0] (clamped end, broadcast over the batch); not-a-knot if None
+    :param m_n: the derivative at x[-1]; not-a-knot if None
+    :param axis: the axis of y along which the function is sampled
+    :return: the derivatives at the grid points, same shape as y
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.moveaxis(np.asarray(y, dtype=np.float64), axis, 0)
+    assert x.ndim == 1 and x.size == y.shape[0] and x.size >= 4
+    shape = y.shape
+    y = y.reshape(x.size, -1)
+    h = np.diff(x)[:, None]
+    d = np.diff(y, axis=0) / h
+
+    ab = np.empty((3, x.size))
+    ab[0, 2:] = h[:-1, 0]                       # coefficient of m_{i+1} in row i
+    ab[1, 1:-1] = 2 * (h[:-1, 0] + h[1:, 0])
+    ab[2, :-2] = h[1:, 0]                       # coefficient of m_{i-1} in row i
+    rhs = np.empty_like(y)
+    rhs[1:-1] = 3 * (h[1:] * d[:-1] + h[:-1] * d[1:])
+
+    if m_0 is None:
+        h0, h1 = h[0, 0], h[1, 0]
+        ab[1, 0], ab[0, 1] = h1, h0 + h1
+        rhs[0] = ((h0 + 2 * (h0 + h1)) * h1 * d[0] + h0**2 * d[1]) / (h0 + h1)
+    else:
+        ab[1, 0], ab[0, 1] = 1.0, 0.0
+        rhs[0] = np.broadcast_to(m_0, shape[1:]).ravel()
+    if m_n is None:
+        h0, h1 = h[-1, 0], h[-2, 0]             # mirrored at the right end
+        ab[1, -1], ab[2, -2] = h1, h0 + h1
+        rhs[-1] = ((h0 + 2 * (h0 + h1)) * h1 * d[-1] + h0**2 * d[-2]) / (h0 + h1)
+    else:
+        ab[1, -1], ab[2, -2] = 1.0, 0.0
+        rhs[-1] = np.broadcast_to(m_n, shape[1:]).ravel()
+
+    m = solve_banded((1, 1), ab, rhs, overwrite_ab=True, overwrite_b=True, check_finite=False)
+    return np.moveaxis(m.reshape(shape), 0, axis)
+
+if __name__ == "__main__":
+    x = np.linspace(0, 2 * np.pi, 10**7 + 1)
+    start = time.perf_counter()
+    m = spline_derivative(x, np.sin(x), m_0=1.0, m_n=1.0)
+    print(f"{x.size} samples (clamped): {time.perf_counter() - start:.2f} s, max error = {np.abs(m - np.cos(x)).max():.1e}")
+
+    # nonuniform grid, a batch of 100 functions sin(k x), not-a-knot ends, compared with scipy
+    x = np.sort(np.random.default_rng(42).uniform(0, 2 * np.pi, 2001))
+    k = np.arange(1, 101)[:, None]
+    y = np.sin(k * x)
+    start = time.perf_counter()
+    m = spline_derivative(x, y)
+    print(f"batch of {k.size} on a nonuniform grid: {time.perf_counter() - start:.3f} s, "
+          f"max difference to CubicSpline {np.abs(m - CubicSpline(x, y, axis=1).derivative()(x)).max():.1e}")